@@ -0,0 +1,32 @@
+"""bookmark updated_at
+
+Revision ID: 3b9e1f2a7c41
+Revises: d7fc7087b17d
+Create Date: 2026-10-19 09:12:03.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f2a7c41'
+down_revision: Union[str, Sequence[str], None] = 'd7fc7087b17d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'bookmarks',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    op.execute("UPDATE bookmarks SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('bookmarks', 'updated_at')
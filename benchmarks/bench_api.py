@@ -0,0 +1,333 @@
+"""End-to-end API benchmark: a scripted reader journey against a seeded Postgres.
+
+Each virtual user loops list -> novel detail -> chapter -> history write ->
+bookmark sync for the configured duration. Throughput and p50/p95/p99 are
+reported per endpoint and written to a JSON file that later runs can be
+compared against. The database is the one configured for the app
+(DATABASE_URL / .env); point it at a scratch database.
+
+    python -m benchmarks.bench_api seed --novels 1000 --users 500
+    python -m benchmarks.bench_api run --vus 50 --duration 60 --out baseline.json
+    python -m benchmarks.bench_api run --vus 50 --duration 60 --out current.json
+    python -m benchmarks.bench_api compare baseline.json current.json --threshold 0.1
+
+`run` drives the app in-process (lifespan included) unless --base-url points
+at a running server that shares the same database and SECRET_KEY. For
+production-sized data, load benchmarks.generate_catalog instead of `seed`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from sqlalchemy import insert, select
+
+load_dotenv()
+
+from src.database import get_engine
+from src.models import Chapter, Novel, User, Volume
+from src.users.utils import create_access_token
+
+USERNAME_PREFIX = "bench_"
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+WORDS = (
+    "the of and to a in he she was that it his her with as for had you not be on at by "
+    "sword mage guild dungeon academy princess demon king level skill quest village "
+    "storm blade shadow spirit dragon heart night moon ancient forbidden system"
+).split()
+TAGS = ["action", "adventure", "comedy", "drama", "fantasy", "harem", "isekai", "mystery",
+        "romance", "school life", "slice of life", "supernatural", "tragedy"]
+STATUSES = ["ongoing", "completed", "hiatus"]
+TYPES = ["Light Novel", "Web Novel", "Original"]
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def chapter_content(rng: random.Random, min_bytes: int) -> str:
+    parts = []
+    size = 0
+    while size < min_bytes:
+        text = paragraph(rng, rng.randint(40, 120))
+        parts.append(text)
+        size += len(text) + 2
+    return "\n\n".join(parts)
+
+
+def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    engine = get_engine()
+    with engine.begin() as conn:
+        if conn.execute(select(User.id).where(User.username.like(f"{USERNAME_PREFIX}%")).limit(1)).first():
+            print("already seeded (bench_* users exist); use a fresh database to reseed")
+            return
+
+        conn.execute(insert(User.__table__), [
+            {
+                "id": uuid.uuid4(),
+                "username": f"{USERNAME_PREFIX}{i}",
+                "email": f"{USERNAME_PREFIX}{i}@bench.local",
+                # Never logged in with; the run mints access tokens directly
+                "password": "!",
+            }
+            for i in range(args.users)
+        ])
+
+        chapters_total = 0
+        for start in range(0, args.novels, args.batch_size):
+            novels, volumes, chapters = [], [], []
+            for i in range(start, min(start + args.batch_size, args.novels)):
+                novel_id = uuid.uuid4()
+                novels.append({
+                    "id": novel_id,
+                    "title": f"Bench Novel {i}",
+                    "authors": [f"Author {rng.randint(1, args.novels // 5 + 1)}"],
+                    "tags": rng.sample(TAGS, rng.randint(2, 5)),
+                    "type": rng.choice(TYPES),
+                    "status": rng.choice(STATUSES),
+                    "description": paragraph(rng, 80),
+                    "meta": {"source": "bench"},
+                    "image_url": f"https://img.bench.local/{i}.jpg",
+                    "total_views": int(rng.paretovariate(1.2) * 100),
+                    "last_updated": datetime.now(timezone.utc),
+                })
+                for v in range(rng.randint(1, args.max_volumes)):
+                    volume_id = uuid.uuid4()
+                    volumes.append({"id": volume_id, "novel_id": novel_id, "title": f"Volume {v + 1}", "order": v + 1})
+                    for c in range(rng.randint(5, args.max_chapters)):
+                        chapters.append({
+                            "id": uuid.uuid4(),
+                            "volume_id": volume_id,
+                            "title": f"Chapter {c + 1}",
+                            "order": c + 1,
+                            "content": chapter_content(rng, args.chapter_bytes),
+                        })
+            conn.execute(insert(Novel.__table__), novels)
+            conn.execute(insert(Volume.__table__), volumes)
+            conn.execute(insert(Chapter.__table__), chapters)
+            chapters_total += len(chapters)
+            print(f"seeded {min(start + args.batch_size, args.novels)}/{args.novels} novels, {chapters_total} chapters")
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+            return None
+        return response
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        endpoints = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(label) or [0.0]
+            endpoints[label] = {
+                "requests": len(self.latencies.get(label, [])),
+                "errors": self.errors.get(label, 0),
+                "throughput_rps": round(len(self.latencies.get(label, [])) / elapsed, 2),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            }
+        return endpoints
+
+
+async def journey(client: httpx.AsyncClient, recorder: Recorder, token: str, rng: random.Random,
+                  deadline: float, think: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        listing = await recorder.call(
+            client, "GET /api/novels", "GET", "/api/novels",
+            params={"limit": 50, "sort_by": rng.choice(["last_updated", "views"])},
+        )
+        if listing is None or not listing.json():
+            continue
+        briefs = listing.json()
+        # Readers mostly open what is near the top of the list
+        novel = briefs[min(len(briefs) - 1, int(rng.expovariate(0.3)))]
+
+        detail = await recorder.call(client, "GET /api/novels/{novel_id}", "GET", f"/api/novels/{novel['id']}")
+        if detail is None:
+            continue
+        chapters = [c for v in detail.json()["volumes"] for c in v["chapters"]]
+        if not chapters:
+            continue
+        chapter = rng.choice(chapters)
+
+        if await recorder.call(client, "GET /api/chapters/{chapter_id}", "GET", f"/api/chapters/{chapter['id']}") is None:
+            continue
+        await recorder.call(
+            client, "POST /api/histories", "POST", "/api/histories",
+            json={"novel_id": novel["id"], "chapter_id": chapter["id"]}, headers=headers,
+        )
+        await recorder.call(
+            client, "POST /api/bookmarks/sync", "POST", "/api/bookmarks/sync",
+            json={"items": [{
+                "novel_id": novel["id"],
+                "type": "chapter",
+                "chapter_id": chapter["id"],
+                "line": rng.randint(0, 200),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }]},
+            headers=headers,
+        )
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+@asynccontextmanager
+async def client_for(base_url: Optional[str]):
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            yield client
+        return
+
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with get_engine().connect() as conn:
+        user_ids = conn.execute(
+            select(User.id).where(User.username.like(f"{USERNAME_PREFIX}%")).limit(args.vus)
+        ).scalars().all()
+    if not user_ids:
+        sys.exit("no bench_* users found; run `seed` first")
+    tokens = [create_access_token({"sub": str(user_id)}) for user_id in user_ids]
+
+    recorder = Recorder()
+    async with client_for(args.base_url) as client:
+        if args.warmup:
+            await asyncio.gather(*(
+                journey(client, Recorder(), tokens[i % len(tokens)], random.Random(i), time.perf_counter() + args.warmup, 0)
+                for i in range(min(args.vus, 4))
+            ))
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            journey(client, recorder, tokens[i % len(tokens)], random.Random(args.seed + i), deadline, args.think_ms / 1000)
+            for i in range(args.vus)
+        ))
+        elapsed = time.perf_counter() - start
+
+    endpoints = recorder.summary(elapsed)
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"vus": args.vus, "duration": args.duration, "think_ms": args.think_ms,
+                   "base_url": args.base_url or "in-process", "seed": args.seed},
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def print_result(result: dict) -> None:
+    print(f"{'endpoint':<34}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for label, e in result["endpoints"].items():
+        print(f"{label:<34}{e['requests']:>8}{e['errors']:>6}{e['throughput_rps']:>9.1f}"
+              f"{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+    print(f"total: {result['throughput_rps']:.1f} req/s over {result['elapsed_seconds']}s (latencies in ms)")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    regressions = []
+    for label, base in baseline["endpoints"].items():
+        cur = current["endpoints"].get(label)
+        if cur is None:
+            regressions.append(f"{label}: missing from current run")
+            continue
+        for key in LATENCY_KEYS:
+            if base[key] and cur[key] > base[key] * (1 + threshold):
+                regressions.append(f"{label}: {key} {base[key]:.1f} -> {cur[key]:.1f} (+{cur[key] / base[key] - 1:.0%})")
+        if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{label}: throughput {base['throughput_rps']:.1f} -> {cur['throughput_rps']:.1f} rps "
+                               f"({cur['throughput_rps'] / base['throughput_rps'] - 1:.0%})")
+        if cur["errors"] > base["errors"]:
+            regressions.append(f"{label}: errors {base['errors']} -> {cur['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("seed", help="Insert bench users, novels, volumes and chapters")
+    p.add_argument("--novels", type=int, default=1000)
+    p.add_argument("--users", type=int, default=500)
+    p.add_argument("--max-volumes", type=int, default=3)
+    p.add_argument("--max-chapters", type=int, default=30, help="Max chapters per volume")
+    p.add_argument("--chapter-bytes", type=int, default=4000, help="Approximate chapter content size")
+    p.add_argument("--batch-size", type=int, default=100, help="Novels per insert batch")
+    p.add_argument("--seed", type=int, default=42)
+
+    p = commands.add_parser("run", help="Run the journey and write a JSON result")
+    p.add_argument("--vus", type=int, default=50, help="Concurrent virtual users")
+    p.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    p.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before the run")
+    p.add_argument("--think-ms", type=float, default=0, help="Mean pause between journeys")
+    p.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="Write the result JSON here")
+
+    p = commands.add_parser("compare", help="Flag regressions of a result against a baseline")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.10, help="Allowed relative change, 0.10 = 10%%")
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(args)
+    elif args.command == "run":
+        result = asyncio.run(run(args))
+        print_result(result)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"wrote {args.out}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
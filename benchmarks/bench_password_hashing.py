@@ -0,0 +1,93 @@
+"""Latency of an unrelated endpoint while a burst of logins is hashed.
+
+Compares bcrypt called inline in the handler (old behaviour) with the process
+pool in src.hashing. No database needed:
+
+    python -m benchmarks.bench_password_hashing --logins 50 --pings 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.hashing import PasswordHasher, hash_secret, verify_and_update
+
+
+def build_app(hasher: PasswordHasher, stored_hash: str, inline: bool, rounds: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.post("/login")
+    async def login() -> dict:
+        if inline:
+            valid, _ = verify_and_update("correct horse", stored_hash, rounds)
+        else:
+            valid, _ = await hasher.verify("correct horse", stored_hash)
+        return {"ok": valid}
+
+    return app
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(inline: bool, args: argparse.Namespace, stored_hash: str) -> dict:
+    hasher = PasswordHasher(args.rounds, args.workers, max_pending=args.logins)
+    app = build_app(hasher, stored_hash, inline, args.rounds)
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if not inline:
+                await client.post("/login")  # Warm up the pool so process spawn is not measured
+
+            async def ping_loop() -> None:
+                for _ in range(args.pings):
+                    start = time.perf_counter()
+                    await client.get("/ping")
+                    latencies.append(time.perf_counter() - start)
+                    await asyncio.sleep(0.001)
+
+            start = time.perf_counter()
+            logins = [client.post("/login") for _ in range(args.logins)]
+            await asyncio.gather(ping_loop(), *logins)
+            elapsed = time.perf_counter() - start
+    finally:
+        hasher.shutdown()
+
+    return {
+        "mode": "inline" if inline else "pool",
+        "elapsed_s": elapsed,
+        "ping_p50_ms": statistics.median(latencies) * 1000,
+        "ping_p99_ms": percentile(latencies, 0.99) * 1000,
+        "ping_max_ms": max(latencies) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent logins in the burst")
+    parser.add_argument("--pings", type=int, default=500, help="Requests to the unrelated endpoint")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes")
+    args = parser.parse_args()
+
+    stored_hash = hash_secret("correct horse", args.rounds)
+    for inline in (True, False):
+        r = asyncio.run(run(inline, args, stored_hash))
+        print(
+            f"{r['mode']:>6}: burst {r['elapsed_s']:.2f}s | /ping p50 {r['ping_p50_ms']:.2f}ms "
+            f"p99 {r['ping_p99_ms']:.2f}ms max {r['ping_max_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
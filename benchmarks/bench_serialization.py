@@ -0,0 +1,86 @@
+"""Per-row response serialization cost for a limit=200 novel list.
+
+Compares the old path (model_validate per row, then FastAPI re-validates and
+jsonable_encoder's the result against response_model) with the precompiled
+Serializer that validates once and dumps to JSON bytes in pydantic-core.
+
+    python -m benchmarks.bench_serialization --rows 200 --requests 500
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from src.novels.schemas import NovelBrief
+from src.serialization import PreserializedJSONResponse, Serializer
+
+
+def make_rows(n: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid4(),
+            "title": f"Novel {i}",
+            "image_url": f"https://img.example/{i}.jpg",
+            "authors": ["Author A", "Author B"],
+            "tags": ["action", "fantasy", "romance", "school life"],
+            "type": "Light Novel",
+            "last_updated": now,
+            "status": "ongoing",
+            "meta": {"views": i * 10, "rating": 4.5, "source": "bench"},
+        }
+        for i in range(n)
+    ]
+
+
+def make_app(rows: List[dict]) -> FastAPI:
+    app = FastAPI()
+    serializer = Serializer(List[NovelBrief])
+
+    @app.get("/old", response_model=List[NovelBrief])
+    async def old() -> List[NovelBrief]:
+        return [NovelBrief.model_validate(r) for r in rows]
+
+    @app.get("/new", response_model=List[NovelBrief])
+    async def new() -> PreserializedJSONResponse:
+        return serializer.response(rows)
+
+    return app
+
+
+async def bench(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    await client.get(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return (time.perf_counter() - start) / requests
+
+
+async def run(rows: int, requests: int) -> None:
+    app = make_app(make_rows(rows))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        old = await bench(client, "/old", requests)
+        new = await bench(client, "/new", requests)
+
+    for label, elapsed in (("old", old), ("new", new)):
+        print(f"{label}: {elapsed * 1000:.2f} ms/request, {elapsed / rows * 1e6:.1f} us/row")
+    print(f"speedup: {old / new:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="Rows per response (the list limit)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.requests))
+
+
+if __name__ == "__main__":
+    main()
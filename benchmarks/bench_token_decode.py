@@ -0,0 +1,39 @@
+"""Access token decode throughput with and without the verified-token cache.
+
+    python -m benchmarks.bench_token_decode --tokens 1000 --rounds 20
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from src.users.utils import access_token_cache, create_access_token, decode_access_token, verify_access_token
+
+
+def bench(fn, tokens, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            fn(token)
+    elapsed = time.perf_counter() - start
+    return len(tokens) * rounds / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000, help="Distinct tokens (active users)")
+    parser.add_argument("--rounds", type=int, default=20, help="Times each token is presented")
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": str(uuid4())}) for _ in range(args.tokens)]
+
+    uncached = bench(verify_access_token, tokens, args.rounds)
+    access_token_cache.clear()
+    cached = bench(decode_access_token, tokens, args.rounds)
+
+    print(f"uncached: {uncached:,.0f} decodes/s")
+    print(f"  cached: {cached:,.0f} decodes/s ({cached / uncached:.1f}x, "
+          f"hit ratio {access_token_cache.hits / (access_token_cache.hits + access_token_cache.misses):.2%})")
+
+
+if __name__ == "__main__":
+    main()
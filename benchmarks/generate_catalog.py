@@ -0,0 +1,317 @@
+"""Generate a production-sized catalog for scale testing, loaded with COPY.
+
+Defaults match production volumes (50k novels, 5M chapters of multi-KB
+markdown, 1M users with reading history and bookmarks); --scale shrinks
+everything proportionally. Distributions are skewed like real traffic:
+Zipf popularity over novels, log-normal series length, Pareto-distributed
+reading per user that favours popular novels. The same --seed always
+produces the same rows, ids included. Target a fresh, migrated database:
+
+    alembic upgrade head
+    python -m benchmarks.generate_catalog --scale 0.01 --seed 1
+    python -m benchmarks.generate_catalog --seed 1    # full size, tens of GB
+
+Users are named bench_<n> so `benchmarks.bench_api run` works on the result.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Sequence
+
+from dotenv import load_dotenv
+from sqlalchemy import Table
+
+load_dotenv()
+
+from benchmarks.bench_api import STATUSES, TAGS, TYPES, USERNAME_PREFIX, WORDS
+from src.database import get_engine
+from src.models import Bookmark, BookmarkType, Chapter, History, Novel, User, Volume
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+PARAGRAPH_POOL_SIZE = 4096
+COPY_BUFFER_BYTES = 1 << 20
+
+
+class Escaped(str):
+    """Field already in COPY text format"""
+
+
+def copy_field(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, Escaped):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return escape("{" + ",".join('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in value) + "}")
+    if isinstance(value, dict):
+        return escape(json.dumps(value))
+    if isinstance(value, str):
+        return escape(value)
+    return str(value)
+
+
+def escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class CopyStream:
+    """File-like reader over generated rows so COPY never holds a table in memory"""
+
+    def __init__(self, rows: Iterable[Sequence]) -> None:
+        self.rows: Iterator[Sequence] = iter(rows)
+        self.buffer = b""
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self.buffer]
+        filled = len(self.buffer)
+        while size < 0 or filled < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = ("\t".join(copy_field(v) for v in row) + "\n").encode()
+            chunks.append(line)
+            filled += len(line)
+            self.count += 1
+        data = b"".join(chunks)
+        if size < 0:
+            self.buffer = b""
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+
+def copy_rows(raw, table: Table, columns: List[str], rows: Iterable[Sequence]) -> int:
+    unknown = set(columns) - set(table.c.keys())
+    if unknown:
+        raise ValueError(f"{table.name} has no columns {sorted(unknown)}")
+    stream = CopyStream(rows)
+    started = time.perf_counter()
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    with raw.cursor() as cursor:
+        cursor.copy_expert(f'COPY "{table.name}" ({quoted}) FROM STDIN', stream, size=COPY_BUFFER_BYTES)
+    raw.commit()
+    print(f"{table.name}: {stream.count:,} rows in {time.perf_counter() - started:.1f}s")
+    return stream.count
+
+
+class Catalog:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.seed = args.seed
+        self.namespace = uuid.uuid5(uuid.NAMESPACE_URL, f"novel-recommend/catalog/{args.seed}")
+        self.novels = max(1, int(args.novels * args.scale))
+        self.users = max(1, int(args.users * args.scale))
+        self.chapter_bytes = args.chapter_kb * 1024
+
+        rng = self.rng("shape")
+        # Log-normal series length: most novels are short, a long tail runs to thousands of chapters
+        raw = [rng.lognormvariate(0, 1.1) for _ in range(self.novels)]
+        target = max(self.novels, int(args.chapters * args.scale))
+        factor = target / sum(raw)
+        self.chapter_counts = [max(1, round(r * factor)) for r in raw]
+        self.volume_sizes = [rng.randint(15, 60) for _ in range(self.novels)]
+
+        # Zipf popularity over a random ranking, so title order says nothing about popularity
+        ranks = list(range(self.novels))
+        rng.shuffle(ranks)
+        self.popularity = [1 / (rank + 1) ** args.zipf for rank in ranks]
+        self.cum_popularity = list(accumulate(self.popularity))
+
+    def rng(self, stream: str, index: int = 0) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}:{index}")
+
+    def id(self, kind: str, *parts) -> uuid.UUID:
+        return uuid.uuid5(self.namespace, ":".join([kind, *map(str, parts)]))
+
+    def paragraphs(self) -> List[str]:
+        rng = self.rng("paragraphs")
+        pool = []
+        for i in range(PARAGRAPH_POOL_SIZE):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(50, 150))]
+            if rng.random() < 0.3:
+                start = rng.randrange(len(words) - 8)
+                words[start] = '"' + words[start]
+                words[start + 6] += '," he said.'
+            if rng.random() < 0.1:
+                words[0] = "*" + words[0]
+                words[3] += "*"
+            text = " ".join(words).capitalize() + "."
+            if i % 64 == 0:
+                text = f"## {rng.choice(WORDS).capitalize()} {rng.choice(WORDS)}\n\n{text}"
+            pool.append(escape(text))
+        return pool
+
+    def novel_rows(self) -> Iterator[tuple]:
+        rng = self.rng("novels")
+        authors = max(1, self.novels // 4)
+        for i in range(self.novels):
+            views = int(5_000_000 * self.popularity[i])
+            ratings = int(views * rng.uniform(0.001, 0.01))
+            yield (
+                self.id("novel", i),
+                f"Bench Novel {i}",
+                [f"Author {int(rng.paretovariate(1.1)) % authors}"],
+                rng.sample(TAGS, rng.randint(2, 6)),
+                rng.choice(TYPES),
+                rng.choices(STATUSES, weights=(6, 3, 1))[0],
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 200))),
+                {"source": "bench", "chapters": self.chapter_counts[i]},
+                views,
+                int(views * rng.uniform(0.005, 0.05)),
+                ratings,
+                round(rng.triangular(2.5, 5.0, 4.1), 2) if ratings else 0,
+                f"https://img.bench.local/{i}.jpg",
+                self.updated_at(rng, i),
+                NOW - timedelta(days=rng.uniform(30, 3650)),
+            )
+
+    def updated_at(self, rng: random.Random, novel: int) -> datetime:
+        # Popular novels are the ones still updating
+        return NOW - timedelta(hours=rng.expovariate(1 / 24) / max(self.popularity[novel] * 1000, 0.01))
+
+    def volume_rows(self) -> Iterator[tuple]:
+        for i, count in enumerate(self.chapter_counts):
+            for v in range(-(-count // self.volume_sizes[i])):
+                yield self.id("volume", i, v), self.id("novel", i), f"Volume {v + 1}", v + 1
+
+    def chapter_rows(self) -> Iterator[tuple]:
+        pool = self.paragraphs()
+        rng = self.rng("chapters")
+        for i, count in enumerate(self.chapter_counts):
+            size = self.volume_sizes[i]
+            started = NOW - timedelta(days=count * rng.uniform(0.5, 3))
+            for n in range(count):
+                target = rng.lognormvariate(0, 0.4) * self.chapter_bytes
+                parts, length = [], 0
+                while length < target:
+                    part = rng.choice(pool)
+                    parts.append(part)
+                    length += len(part)
+                written = started + timedelta(days=n * rng.uniform(0.5, 3))
+                yield (
+                    self.id("chapter", i, n),
+                    self.id("volume", i, n // size),
+                    f"Chapter {n + 1}",
+                    n % size + 1,
+                    Escaped("\\n\\n".join(parts)),
+                    written,
+                    written,
+                    int(self.popularity[i] * 1_000_000 / (n + 1) ** 0.5),
+                )
+
+    def user_rows(self) -> Iterator[tuple]:
+        rng = self.rng("users")
+        for u in range(self.users):
+            yield (
+                self.id("user", u),
+                f"{USERNAME_PREFIX}{u}",
+                f"{USERNAME_PREFIX}{u}@bench.local",
+                "!",  # Not a valid hash: generated users cannot log in
+                NOW - timedelta(days=rng.uniform(0, 1500)),
+            )
+
+    def reading(self, user: int) -> Iterator[tuple]:
+        """(novel, chapter number, read at) for each novel the user has read"""
+        rng = self.rng("reading", user)
+        wanted = min(self.novels, int(rng.paretovariate(1.3)))
+        picks = rng.choices(range(self.novels), cum_weights=self.cum_popularity, k=wanted)
+        for novel in dict.fromkeys(picks):
+            progress = min(self.chapter_counts[novel] - 1, int(rng.expovariate(1 / 20)))
+            yield novel, progress, NOW - timedelta(hours=rng.expovariate(1 / 500))
+
+    def history_rows(self) -> Iterator[tuple]:
+        for u in range(self.users):
+            user_id = self.id("user", u)
+            for novel, chapter, read_at in self.reading(u):
+                yield (
+                    self.id("history", u, novel), user_id, self.id("novel", novel),
+                    self.id("chapter", novel, chapter), read_at,
+                )
+
+    def bookmark_rows(self) -> Iterator[tuple]:
+        rng = self.rng("bookmarks")
+        for u in range(self.users):
+            user_id = self.id("user", u)
+            for novel, chapter, read_at in self.reading(u):
+                if rng.random() < 0.3:
+                    yield (
+                        self.id("bookmark", u, novel), user_id, self.id("novel", novel),
+                        BookmarkType.CHAPTER.name, self.id("chapter", novel, chapter),
+                        rng.randint(0, 300), read_at, read_at,
+                    )
+
+
+def generate(args: argparse.Namespace) -> None:
+    catalog = Catalog(args)
+    print(f"generating {catalog.novels:,} novels, {sum(catalog.chapter_counts):,} chapters, "
+          f"{catalog.users:,} users (seed {args.seed})")
+
+    raw = get_engine().raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM "users" WHERE username LIKE %s LIMIT 1', (f"{USERNAME_PREFIX}%",))
+            if cursor.fetchone():
+                raise SystemExit("bench_* users already exist; generate into a fresh database")
+
+        copy_rows(raw, Novel.__table__, [
+            "id", "title", "authors", "tags", "type", "status", "description", "meta", "total_views",
+            "total_favorites", "total_ratings", "average_rating", "image_url", "last_updated", "created_at",
+        ], catalog.novel_rows())
+        copy_rows(raw, Volume.__table__, ["id", "novel_id", "title", "order"], catalog.volume_rows())
+        copy_rows(raw, Chapter.__table__, [
+            "id", "volume_id", "title", "order", "content", "last_updated", "created_at", "total_views",
+        ], catalog.chapter_rows())
+        copy_rows(raw, User.__table__, ["id", "username", "email", "password", "created_at"], catalog.user_rows())
+        copy_rows(raw, History.__table__, ["id", "user_id", "novel_id", "chapter_id", "created_at"], catalog.history_rows())
+        copy_rows(raw, Bookmark.__table__, [
+            "id", "user_id", "novel_id", "type", "chapter_id", "line", "created_at", "updated_at",
+        ], catalog.bookmark_rows())
+
+        started = time.perf_counter()
+        with raw.cursor() as cursor:
+            # novels -> chapters is circular, so the latest chapter is filled in once both exist
+            cursor.execute("""
+                UPDATE novels SET latest_chapter_id = latest.id
+                FROM (
+                    SELECT DISTINCT ON (v.novel_id) v.novel_id, c.id
+                    FROM chapters c JOIN volumes v ON v.id = c.volume_id
+                    ORDER BY v.novel_id, v."order" DESC, c."order" DESC
+                ) AS latest
+                WHERE novels.id = latest.novel_id AND novels.title LIKE 'Bench Novel %'
+            """)
+        raw.commit()
+        print(f"novels.latest_chapter_id in {time.perf_counter() - started:.1f}s")
+
+        if not args.no_analyze:
+            # VACUUM cannot run inside a transaction block
+            raw.driver_connection.autocommit = True
+            with raw.cursor() as cursor:
+                for table in (Novel, Volume, Chapter, User, History, Bookmark):
+                    cursor.execute(f'VACUUM ANALYZE "{table.__tablename__}"')
+            raw.driver_connection.autocommit = False
+            print("vacuum analyze done")
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=1, help="Same seed, same rows and ids")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to --novels/--chapters/--users")
+    parser.add_argument("--novels", type=int, default=50_000)
+    parser.add_argument("--chapters", type=int, default=5_000_000, help="Total chapters across all novels")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--chapter-kb", type=float, default=4, help="Median chapter content size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew exponent")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip VACUUM ANALYZE after loading")
+    generate(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
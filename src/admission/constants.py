@@ -0,0 +1,15 @@
+import os
+
+# Requests allowed to run at once per worker; default matches pool_size + max_overflow
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "15"))
+# Slots only the highest priority class may take, so reads keep flowing while search is saturated
+ADMISSION_RESERVED = int(os.getenv("ADMISSION_RESERVED", "3"))
+
+# Retry-After sent with shed requests
+ADMISSION_RETRY_AFTER_SECONDS = 1
+
+# Priority: higher is served first when a slot frees up
+CHAPTER_READ_PRIORITY = 30
+WRITE_PRIORITY = 20
+BROWSE_PRIORITY = 20
+SEARCH_PRIORITY = 10
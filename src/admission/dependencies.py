@@ -0,0 +1,25 @@
+from typing import AsyncIterator, Callable
+
+from src.admission.constants import (
+    BROWSE_PRIORITY,
+    CHAPTER_READ_PRIORITY,
+    SEARCH_PRIORITY,
+    WRITE_PRIORITY,
+)
+from src.admission.utils import RouteClass, admission
+
+# Readers in the middle of a chapter come first; list/search is the first thing to shed
+CHAPTER_READ = admission.register(RouteClass("chapter_read", CHAPTER_READ_PRIORITY, max_concurrency=12, max_queue=100, deadline=2.0))
+WRITE = admission.register(RouteClass("write", WRITE_PRIORITY, max_concurrency=8, max_queue=50, deadline=2.0))
+BROWSE = admission.register(RouteClass("browse", BROWSE_PRIORITY, max_concurrency=8, max_queue=50, deadline=1.0))
+SEARCH = admission.register(RouteClass("search", SEARCH_PRIORITY, max_concurrency=5, max_queue=20, deadline=0.5))
+
+
+def admit(route_class: RouteClass) -> Callable[[], AsyncIterator[None]]:
+    """Route dependency holding an admission slot for the duration of the request"""
+
+    async def dependency() -> AsyncIterator[None]:
+        async with admission.slot(route_class):
+            yield
+
+    return dependency
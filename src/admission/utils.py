@@ -0,0 +1,135 @@
+import asyncio
+import bisect
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Tuple
+
+from src.admission.constants import ADMISSION_CAPACITY, ADMISSION_RESERVED, ADMISSION_RETRY_AFTER_SECONDS
+from src.counters import ADMISSION_SHED
+from src.exceptions import ServiceBusyError
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    priority: int
+    max_concurrency: int
+    max_queue: int
+    deadline: float  # Seconds a request may wait for a slot before it is shed
+
+
+@dataclass
+class AdmissionStats:
+    active: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+
+
+@dataclass(order=True)
+class _Waiter:
+    sort_key: Tuple[int, int]
+    route_class: RouteClass = field(compare=False)
+    future: "asyncio.Future[None]" = field(compare=False)
+
+
+class AdmissionController:
+    """Priority-aware concurrency limiter in front of the database pool.
+
+    Each route class has its own concurrency limit, bounded wait queue and
+    wait deadline; all classes share `capacity` slots, and classes below the
+    top priority may not take the last `reserved` of them. Freed slots go to
+    the highest priority waiter that fits. Requests that find the queue full
+    or wait past their deadline get ServiceBusyError (503 + Retry-After)
+    instead of piling up on the pool until clients time out.
+    """
+
+    def __init__(self, capacity: int = ADMISSION_CAPACITY, reserved: int = ADMISSION_RESERVED) -> None:
+        self.capacity = capacity
+        self.reserved = min(reserved, capacity - 1)
+        self.in_use = 0
+        self.stats: Dict[str, AdmissionStats] = {}
+        self._top_priority = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def register(self, route_class: RouteClass) -> RouteClass:
+        self.stats.setdefault(route_class.name, AdmissionStats())
+        self._top_priority = max(self._top_priority, route_class.priority)
+        return route_class
+
+    def _fits(self, route_class: RouteClass) -> bool:
+        limit = self.capacity if route_class.priority >= self._top_priority else self.capacity - self.reserved
+        return self.in_use < limit and self.stats[route_class.name].active < route_class.max_concurrency
+
+    def _take(self, route_class: RouteClass) -> None:
+        self.in_use += 1
+        stats = self.stats[route_class.name]
+        stats.active += 1
+        stats.admitted += 1
+
+    def _busy(self, route_class: RouteClass) -> ServiceBusyError:
+        return ServiceBusyError(f"Too many {route_class.name} requests, retry later", ADMISSION_RETRY_AFTER_SECONDS)
+
+    async def acquire(self, route_class: RouteClass) -> None:
+        stats = self.stats[route_class.name]
+        # Waiters of the same or higher priority go first
+        ahead = any(w.route_class.priority >= route_class.priority for w in self._waiters)
+        if not ahead and self._fits(route_class):
+            self._take(route_class)
+            return
+        if stats.queued >= route_class.max_queue:
+            stats.rejected += 1
+            ADMISSION_SHED.labels(route_class.name, "queue_full").inc()
+            raise self._busy(route_class)
+
+        waiter = _Waiter((-route_class.priority, next(self._seq)), route_class, asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiters, waiter)
+        stats.queued += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), route_class.deadline)
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                return  # Granted on the same tick the deadline hit
+            self._waiters.remove(waiter)
+            stats.timed_out += 1
+            ADMISSION_SHED.labels(route_class.name, "deadline").inc()
+            raise self._busy(route_class)
+        except asyncio.CancelledError:
+            # Client went away while queued; give back a slot granted meanwhile
+            if waiter.future.done():
+                self.release(route_class)
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            stats.queued -= 1
+
+    @asynccontextmanager
+    async def slot(self, route_class: RouteClass) -> AsyncIterator[None]:
+        """Hold a slot for the body of an `async with`"""
+        await self.acquire(route_class)
+        try:
+            yield
+        finally:
+            self.release(route_class)
+
+    def release(self, route_class: RouteClass) -> None:
+        self.in_use -= 1
+        self.stats[route_class.name].active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for waiter in list(self._waiters):
+            if self.in_use >= self.capacity:
+                return
+            if self._fits(waiter.route_class):
+                self._waiters.remove(waiter)
+                self._take(waiter.route_class)
+                waiter.future.set_result(None)
+
+
+admission = AdmissionController()
@@ -0,0 +1,9 @@
+import os
+
+MAX_SYNC_ITEMS = 500
+
+# Reading-position heartbeats
+POSITION_FLUSH_INTERVAL_SECONDS = float(os.getenv("POSITION_FLUSH_INTERVAL_SECONDS", "5"))
+POSITION_MAX_STALENESS_SECONDS = float(os.getenv("POSITION_MAX_STALENESS_SECONDS", "30"))  # Max time a position stays in memory only
+POSITION_MAX_PENDING = int(os.getenv("POSITION_MAX_PENDING", "10000"))  # Flush early above this many buffered positions
+POSITION_FLUSH_BATCH_SIZE = 1000
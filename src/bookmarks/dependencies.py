@@ -1,9 +1,12 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_db
+from src.database import get_async_db, get_async_read_db
 
 
 async def db_dep(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
     return db
 
+
+async def read_db_dep(db: AsyncSession = Depends(get_async_read_db)) -> AsyncSession:
+    return db
@@ -1,11 +1,18 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.bookmarks.schemas import BookmarkCreate, BookmarkDetail, BookmarkOut, BookmarkUpdate
-from src.bookmarks.dependencies import db_dep
+from src.bookmarks.schemas import (
+    BookmarkCreate,
+    BookmarkDetail,
+    BookmarkOut,
+    BookmarkPosition,
+    BookmarkSyncRequest,
+    BookmarkUpdate,
+)
+from src.bookmarks.dependencies import db_dep, read_db_dep
 from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.bookmarks.service import (
     create_bookmark,
@@ -13,11 +20,15 @@ from src.bookmarks.service import (
     delete_bookmark_by_novel,
     get_bookmark,
     list_bookmarks,
+    sync_bookmarks,
     update_bookmark,
 )
 from src.pagination import paginate_params
 from src.bookmarks.exceptions import BookmarkAlreadyExistsError
+from src.bookmarks.utils import position_store
 from src.users.dependencies import CurrentUser
+from src.admission.dependencies import BROWSE, WRITE, admit
+from src.fields import Fields, fields_query, sparse_serializer
 
 
 router = APIRouter(prefix="/bookmarks", tags=["bookmarks"])
@@ -45,23 +56,60 @@ async def create_bookmark_endpoint(
         )
 
 
+@router.post(
+    "/sync",
+    dependencies=[Depends(admit(WRITE))],
+    response_model=List[BookmarkOut],
+    status_code=status.HTTP_200_OK,
+    summary="Sync bookmarks",
+    description=(
+        "Apply many bookmark states in one round trip, last-writer-wins by `updated_at`. "
+        "Returns only the bookmarks the server holds a newer state for."
+    ),
+)
+async def sync_bookmarks_endpoint(
+    data: BookmarkSyncRequest,
+    current_user: CurrentUser,
+    db: AsyncSession = Depends(db_dep)
+) -> List[BookmarkOut]:
+    bookmarks = await sync_bookmarks(db, current_user.id, data.items)
+    return [BookmarkOut.model_validate(b) for b in bookmarks]
+
+
+@router.post(
+    "/position",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Report reading position",
+    description=(
+        "Heartbeat of the reader's position in a bookmarked novel. Positions are buffered "
+        "in memory and written to the bookmark in batches, so a report is not visible "
+        "immediately."
+    ),
+)
+async def report_position_endpoint(data: BookmarkPosition, current_user: CurrentUser) -> None:
+    position_store.record(current_user.id, data.novel_id, data.chapter_id, data.line)
+    return None
+
+
 @router.get(
     "",
+    dependencies=[Depends(admit(BROWSE))],
     response_model=List[BookmarkDetail],
     status_code=status.HTTP_200_OK,
     summary="List bookmarks",
-    description="List all bookmarks for the current user.",
+    description="List all bookmarks for the current user. Pass `fields` to return only some fields; novel and chapter are only loaded when included.",
 )
 async def list_bookmarks_endpoint(
     current_user: CurrentUser,
     bookmark_type: Optional[str] = Query(default=None, regex="^(novel|chapter)$"),
     skip: int | None = Query(default=0, ge=0),
     limit: int | None = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
-    db: AsyncSession = Depends(db_dep),
-) -> List[BookmarkDetail]:
+    fields: Fields = Depends(fields_query(BookmarkDetail)),
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
     s, l = paginate_params(skip, limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
-    bookmarks = await list_bookmarks(db, current_user.id, s, l, bookmark_type)
-    return [BookmarkDetail.model_validate(b) for b in bookmarks]
+    bookmarks = await list_bookmarks(db, current_user.id, s, l, bookmark_type, fields)
+    return sparse_serializer(BookmarkDetail, fields, many=True).response(bookmarks)
 
 
 @router.get(
@@ -74,7 +122,7 @@ async def list_bookmarks_endpoint(
 async def get_bookmark_endpoint(
     bookmark_id: UUID,
     current_user: CurrentUser,
-    db: AsyncSession = Depends(db_dep)
+    db: AsyncSession = Depends(read_db_dep)
 ) -> BookmarkDetail:
     bookmark = await get_bookmark(db, bookmark_id, current_user.id)
     if not bookmark:
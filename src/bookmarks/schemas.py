@@ -1,9 +1,11 @@
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field, model_validator
 from enum import Enum
 
+from src.bookmarks.constants import MAX_SYNC_ITEMS
+
 
 
 
@@ -36,12 +38,37 @@ class BookmarkOut(BookmarkBase):
     id: UUID
     user_id: UUID
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
 
+class BookmarkPosition(BaseModel):
+    novel_id: UUID
+    chapter_id: Optional[UUID] = None
+    line: Optional[int] = Field(default=None, ge=0)
+
+
+
+class BookmarkSyncItem(BookmarkBase):
+    # Compared with the timestamptz column, so naive times are rejected rather than guessed at
+    updated_at: AwareDatetime = Field(..., description="Client-side time of the last change to this bookmark, with a UTC offset")
+
+    @model_validator(mode="after")
+    def check_chapter(self):
+        if self.type == BookmarkTypeEnum.CHAPTER and self.chapter_id is None:
+            raise ValueError("A chapter bookmark needs a chapter_id")
+        return self
+
+
+
+class BookmarkSyncRequest(BaseModel):
+    items: List[BookmarkSyncItem] = Field(default_factory=list, max_length=MAX_SYNC_ITEMS)
+
+
+
 class NovelBrief(BaseModel):
     id: UUID
     title: str
@@ -1,39 +1,42 @@
-from typing import List, Optional
-from uuid import UUID
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set
+from uuid import UUID, uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import desc, select
+from sqlalchemy.orm import noload, selectinload
+from sqlalchemy import any_, bindparam, cast, column, delete, desc, exists, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 
 from src.models import Bookmark, BookmarkType as BookmarkTypeModel, Novel, Chapter
-from src.bookmarks.schemas import BookmarkCreate, BookmarkUpdate
+from src.bookmarks.schemas import BookmarkCreate, BookmarkDetail, BookmarkSyncItem, BookmarkUpdate
 from src.bookmarks.exceptions import BookmarkNotFoundError, BookmarkAlreadyExistsError
+from src.fields import Fields, includes, sparse_model
+from src.utils import select_from_schema
+
+if TYPE_CHECKING:
+    from src.bookmarks.utils import PendingPosition
 
 
 async def create_bookmark(db: AsyncSession, user_id: UUID, data: BookmarkCreate) -> Bookmark:
     """Create a new bookmark for a user"""
-    # Check if bookmark already exists
-    stmt = select(Bookmark).filter(
-        Bookmark.user_id == user_id,
-        Bookmark.novel_id == data.novel_id,
-        Bookmark.type == data.type.value
+    stmt = (
+        insert(Bookmark)
+        .values(
+            user_id=user_id,
+            novel_id=data.novel_id,
+            type=BookmarkTypeModel(data.type.value),
+            chapter_id=data.chapter_id,
+            line=data.line,
+        )
+        .on_conflict_do_nothing(index_elements=[Bookmark.user_id, Bookmark.novel_id])
+        .returning(Bookmark)
     )
     result = await db.execute(stmt)
-    existing = result.scalar_one_or_none()
-    
-    if existing:
+    bookmark = result.scalar_one_or_none()
+
+    if bookmark is None:
         raise BookmarkAlreadyExistsError("Bookmark already exists for this novel")
-    
-    bookmark = Bookmark(
-        user_id=user_id,
-        novel_id=data.novel_id,
-        type=BookmarkTypeModel(data.type.value),
-        chapter_id=data.chapter_id,
-        line=data.line,
-    )
-    db.add(bookmark)
+
     await db.commit()
-    await db.refresh(bookmark)
     return bookmark
 
 
@@ -57,19 +60,37 @@ async def list_bookmarks(
     skip: int = 0,
     limit: int = 20,
     bookmark_type: Optional[str] = None,
+    fields: Fields = None,
 ) -> List[Bookmark]:
-    """List all bookmarks for a user"""
-    stmt = select(Bookmark).options(
-        selectinload(Bookmark.novel),
-        selectinload(Bookmark.chapter)
-    ).filter(Bookmark.user_id == user_id)
+    """List all bookmarks for a user; with `fields`, only what they need is loaded"""
+    with_relations = includes(fields, "novel", "chapter")
+    if with_relations:
+        stmt = select(Bookmark).options(
+            selectinload(Bookmark.novel) if includes(fields, "novel") else noload(Bookmark.novel),
+            selectinload(Bookmark.chapter) if includes(fields, "chapter") else noload(Bookmark.chapter),
+        )
+    else:
+        stmt = select_from_schema(Bookmark, sparse_model(BookmarkDetail, fields))
+    stmt = stmt.filter(Bookmark.user_id == user_id)
     
     if bookmark_type:
         stmt = stmt.filter(Bookmark.type == bookmark_type)
     
     stmt = stmt.order_by(desc(Bookmark.created_at)).offset(skip).limit(limit)
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.scalars().all() if with_relations else result.mappings().all())
+
+
+async def get_bookmarked_novel_ids(db: AsyncSession, user_id: UUID, novel_ids: Sequence[UUID]) -> Set[UUID]:
+    """Return which of `novel_ids` the user has bookmarked (one query via ix_bookmarks_user_novel)"""
+    if not novel_ids:
+        return set()
+    stmt = select(Bookmark.novel_id).filter(
+        Bookmark.user_id == user_id,
+        Bookmark.novel_id == any_(bindparam("novel_ids", list(novel_ids), type_=ARRAY(PG_UUID))),
+    )
+    result = await db.execute(stmt)
+    return set(result.scalars().all())
 
 
 async def update_bookmark(
@@ -79,58 +100,165 @@ async def update_bookmark(
     data: BookmarkUpdate
 ) -> Optional[Bookmark]:
     """Update a bookmark (chapter_id and line)"""
-    stmt = select(Bookmark).filter(
-        Bookmark.id == bookmark_id,
-        Bookmark.user_id == user_id
+    values = {}
+    if data.chapter_id is not None:
+        values["chapter_id"] = data.chapter_id
+    if data.line is not None:
+        values["line"] = data.line
+
+    if not values:
+        stmt = select(Bookmark).filter(Bookmark.id == bookmark_id, Bookmark.user_id == user_id)
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    stmt = (
+        update(Bookmark)
+        .filter(Bookmark.id == bookmark_id, Bookmark.user_id == user_id)
+        .values(**values)
+        .returning(Bookmark)
     )
     result = await db.execute(stmt)
     bookmark = result.scalar_one_or_none()
-    
+
     if not bookmark:
         return None
-    
-    if data.chapter_id is not None:
-        bookmark.chapter_id = data.chapter_id
-    if data.line is not None:
-        bookmark.line = data.line
-    
+
     await db.commit()
-    await db.refresh(bookmark)
     return bookmark
 
 
 async def delete_bookmark(db: AsyncSession, bookmark_id: UUID, user_id: UUID) -> bool:
     """Delete a bookmark (user must own it)"""
-    stmt = select(Bookmark).filter(
-        Bookmark.id == bookmark_id,
-        Bookmark.user_id == user_id
+    stmt = (
+        delete(Bookmark)
+        .filter(Bookmark.id == bookmark_id, Bookmark.user_id == user_id)
+        .returning(Bookmark.id)
     )
     result = await db.execute(stmt)
-    bookmark = result.scalar_one_or_none()
-    
-    if not bookmark:
+    if result.scalar_one_or_none() is None:
         return False
-    
-    await db.delete(bookmark)
+
     await db.commit()
     return True
 
 
 async def delete_bookmark_by_novel(db: AsyncSession, user_id: UUID, novel_id: UUID) -> bool:
     """Delete all bookmarks for a novel"""
-    stmt = select(Bookmark).filter(
-        Bookmark.user_id == user_id,
-        Bookmark.novel_id == novel_id
+    stmt = (
+        delete(Bookmark)
+        .filter(Bookmark.user_id == user_id, Bookmark.novel_id == novel_id)
+        .returning(Bookmark.id)
     )
     result = await db.execute(stmt)
-    bookmarks = list(result.scalars().all())
-    
-    if not bookmarks:
+    if not result.scalars().all():
         return False
-    
-    for bookmark in bookmarks:
-        await db.delete(bookmark)
-    
+
     await db.commit()
     return True
 
+
+async def sync_bookmarks(
+    db: AsyncSession,
+    user_id: UUID,
+    items: Sequence[BookmarkSyncItem],
+) -> List[Bookmark]:
+    """Apply client bookmark states last-writer-wins, return the ones the server holds newer.
+
+    Items whose novel or chapter no longer exists are dropped, so a stale
+    offline queue cannot fail the whole sync on a foreign key.
+    """
+    # Keep only the latest state per novel, ON CONFLICT cannot touch the same row twice
+    latest: Dict[UUID, BookmarkSyncItem] = {}
+    for item in items:
+        current = latest.get(item.novel_id)
+        if current is None or item.updated_at > current.updated_at:
+            latest[item.novel_id] = item
+
+    if not latest:
+        return []
+
+    columns = ("id", "user_id", "novel_id", "type", "chapter_id", "line", "updated_at")
+    incoming = values(
+        *(column(name, Bookmark.__table__.c[name].type) for name in columns),
+        name="incoming",
+    ).data([
+        (uuid4(), user_id, item.novel_id, BookmarkTypeModel(item.type.value), item.chapter_id, item.line, item.updated_at)
+        for item in latest.values()
+    ])
+    referenced = (
+        # VALUES parameters are untyped to Postgres, NULL lines would otherwise come out as text
+        select(*(cast(incoming.c[name], Bookmark.__table__.c[name].type) for name in columns))
+        .join(Novel, Novel.id == incoming.c.novel_id)
+        .outerjoin(Chapter, Chapter.id == incoming.c.chapter_id)
+        .filter(or_(incoming.c.chapter_id.is_(None), Chapter.id.is_not(None)))
+    )
+    upsert = insert(Bookmark).from_select(list(columns), referenced)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[Bookmark.user_id, Bookmark.novel_id],
+        set_={
+            "type": upsert.excluded.type,
+            "chapter_id": upsert.excluded.chapter_id,
+            "line": upsert.excluded.line,
+            "updated_at": upsert.excluded.updated_at,
+        },
+        where=Bookmark.updated_at < upsert.excluded.updated_at,
+    ).returning(Bookmark.novel_id)
+    applied = upsert.cte("applied")
+
+    # The outer SELECT sees the pre-upsert snapshot, so rows skipped by the
+    # WHERE above come back with the server's (newer or equal) state
+    stmt = select(Bookmark).filter(
+        Bookmark.user_id == user_id,
+        Bookmark.novel_id.in_(list(latest.keys())),
+        Bookmark.novel_id.not_in(select(applied.c.novel_id)),
+    )
+    result = await db.execute(stmt)
+    newer = [
+        bookmark for bookmark in result.scalars().all()
+        if bookmark.updated_at is not None and bookmark.updated_at > latest[bookmark.novel_id].updated_at
+    ]
+    # Detached rows keep their loaded state whatever the session's expire_on_commit
+    for bookmark in newer:
+        db.expunge(bookmark)
+    await db.commit()
+    return newer
+
+
+async def save_positions(db: AsyncSession, positions: Sequence["PendingPosition"]) -> None:
+    """Persist buffered reading positions onto existing bookmarks in one executemany.
+
+    Positions naming a chapter that does not exist (anymore) are skipped rather
+    than failing the batch on the foreign key; no chapter keeps the stored one.
+    """
+    if not positions:
+        return
+    table = Bookmark.__table__
+    chapter_id = bindparam("b_chapter_id", type_=table.c.chapter_id.type)
+    stmt = (
+        table.update()
+        .where(
+            table.c.user_id == bindparam("b_user_id"),
+            table.c.novel_id == bindparam("b_novel_id"),
+            table.c.updated_at < bindparam("b_updated_at"),
+            or_(chapter_id.is_(None), exists().where(Chapter.id == chapter_id)),
+        )
+        .values(
+            chapter_id=func.coalesce(chapter_id, table.c.chapter_id),
+            line=bindparam("b_line"),
+            updated_at=bindparam("b_updated_at"),
+        )
+    )
+    await db.execute(
+        stmt,
+        [
+            {
+                "b_user_id": p.user_id,
+                "b_novel_id": p.novel_id,
+                "b_chapter_id": p.chapter_id,
+                "b_line": p.line,
+                "b_updated_at": p.updated_at,
+            }
+            for p in positions
+        ],
+    )
+    await db.commit()
@@ -1 +1,138 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
 
+from src.bookmarks.constants import (
+    POSITION_FLUSH_BATCH_SIZE,
+    POSITION_FLUSH_INTERVAL_SECONDS,
+    POSITION_MAX_PENDING,
+    POSITION_MAX_STALENESS_SECONDS,
+)
+from src.bookmarks.service import save_positions
+from src.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+PositionKey = Tuple[UUID, UUID]  # (user_id, novel_id)
+
+
+@dataclass
+class PendingPosition:
+    user_id: UUID
+    novel_id: UUID
+    chapter_id: Optional[UUID]
+    line: Optional[int]
+    updated_at: datetime
+    first_seen: float  # monotonic time of the oldest unpersisted heartbeat
+
+
+class PositionStore:
+    """In-memory buffer of reading positions, persisted to bookmarks in batches.
+
+    Heartbeats for the same (user_id, novel_id) overwrite each other in memory, so a
+    reader scrolling for a minute costs one UPDATE instead of one transaction per report.
+    A position is never kept in memory only for longer than `max_staleness` seconds.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = POSITION_FLUSH_INTERVAL_SECONDS,
+        max_staleness: float = POSITION_MAX_STALENESS_SECONDS,
+        max_pending: int = POSITION_MAX_PENDING,
+        batch_size: int = POSITION_FLUSH_BATCH_SIZE,
+    ) -> None:
+        self.flush_interval = min(flush_interval, max_staleness)
+        self.max_staleness = max_staleness
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending: Dict[PositionKey, PendingPosition] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: UUID, novel_id: UUID, chapter_id: Optional[UUID], line: Optional[int]) -> None:
+        """Accept a heartbeat; only the latest position per (user, novel) is kept"""
+        key = (user_id, novel_id)
+        existing = self._pending.get(key)
+        self._pending[key] = PendingPosition(
+            user_id=user_id,
+            novel_id=novel_id,
+            chapter_id=chapter_id if chapter_id is not None or existing is None else existing.chapter_id,
+            line=line,
+            updated_at=datetime.now(timezone.utc),
+            first_seen=existing.first_seen if existing else time.monotonic(),
+        )
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def get(self, user_id: UUID, novel_id: UUID) -> Optional[PendingPosition]:
+        return self._pending.get((user_id, novel_id))
+
+    def _take(self, force: bool) -> List[PendingPosition]:
+        if force or len(self._pending) >= self.max_pending:
+            taken = list(self._pending.values())
+            self._pending.clear()
+            return taken
+        deadline = time.monotonic() - self.max_staleness + self.flush_interval
+        due = [key for key, pos in self._pending.items() if pos.first_seen <= deadline]
+        return [self._pending.pop(key) for key in due]
+
+    def _restore(self, positions: List[PendingPosition]) -> None:
+        for pos in positions:
+            key = (pos.user_id, pos.novel_id)
+            newer = self._pending.get(key)
+            if newer is None:
+                self._pending[key] = pos
+            else:
+                newer.first_seen = min(newer.first_seen, pos.first_seen)
+
+    async def flush(self, force: bool = False) -> int:
+        """Persist due positions (all of them if `force`), return how many were written"""
+        async with self._flush_lock:
+            positions = self._take(force)
+            written = 0
+            for start in range(0, len(positions), self.batch_size):
+                batch = positions[start:start + self.batch_size]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await save_positions(db, batch)
+                except Exception:
+                    logger.exception("Failed to persist %d reading positions", len(positions) - written)
+                    self._restore(positions[start:])
+                    break
+                written += len(batch)
+            return written
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background flusher and persist everything still buffered"""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush(force=True)
+
+
+position_store = PositionStore()
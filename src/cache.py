@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from src.counters import CACHE_HITS, CACHE_MISSES
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Named caches, for hit ratio metrics
+caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU cache whose entries also expire after a TTL.
+
+    With `maxbytes` and `sizeof` the entries' total size is bounded too; an entry
+    that grows after being set (say by adding variants) is re-measured with
+    `resize`. Not thread safe; meant to be used from a single event loop per worker.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        name: Optional[str] = None,
+        maxbytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._sizes: Dict[K, int] = {}
+        self._hit_counter = CACHE_HITS.labels(name) if name else None
+        self._miss_counter = CACHE_MISSES.labels(name) if name else None
+        if name:
+            caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is not None and item[0] <= time.monotonic():
+            self.pop(key)
+            item = None
+        if item is None:
+            self.misses += 1
+            if self._miss_counter is not None:
+                self._miss_counter.inc()
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        if self._hit_counter is not None:
+            self._hit_counter.inc()
+        return item[1]
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        self._measure(key, value)
+        self._evict()
+
+    def resize(self, key: K) -> None:
+        """Re-measure an entry whose value grew or shrank in place"""
+        item = self._data.get(key)
+        if item is not None and self.sizeof is not None:
+            self._measure(key, item[1])
+            self._evict()
+
+    def _measure(self, key: K, value: V) -> None:
+        if self.sizeof is not None:
+            size = self.sizeof(value)
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes):
+            self.pop(next(iter(self._data)))
+
+    def pop(self, key: K) -> Optional[V]:
+        item = self._data.pop(key, None)
+        self.nbytes -= self._sizes.pop(key, 0)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.nbytes = 0
@@ -1,24 +1,35 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.chapters.schemas import ChapterCreate, ChapterDetail, ChapterOut, ChapterUpdate
-from src.chapters.dependencies import db_dep
+from src.chapters.dependencies import db_dep, read_db_dep
 from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.chapters.service import (
     create_chapter,
     delete_chapter,
     get_chapter,
+    get_chapter_list_version,
+    get_chapter_version,
     list_chapters,
     update_chapter,
 )
 from src.pagination import paginate_params
+from src.fields import Fields, fields_key, fields_query, sparse_serializer
+from src.conditional import Validator
+from src.compression.utils import cached_payload
+from src.singleflight import SingleFlight
+from src.admission.dependencies import BROWSE, CHAPTER_READ, admit
 
 
 router = APIRouter(prefix="/chapters", tags=["chapters"])
 
+# Identical detail requests arriving together share one version lookup (and one render, in cached_payload)
+chapter_version_flight: SingleFlight[UUID, Optional[Row]] = SingleFlight(name="chapter_version")
+
 
 @router.post(
     "",
@@ -34,36 +45,67 @@ async def create_chapter_endpoint(data: ChapterCreate, db: AsyncSession = Depend
 
 @router.get(
     "",
+    dependencies=[Depends(admit(BROWSE))],
     response_model=List[ChapterOut],
     status_code=status.HTTP_200_OK,
     summary="List chapters",
-    description="List chapters with optional filter by volume_id.",
+    description="List chapters with optional filter by volume_id. Pass `fields` to return only some fields.",
 )
 async def list_chapters_endpoint(
+    request: Request,
     volume_id: Optional[UUID] = Query(default=None),
     skip: int | None = Query(default=0, ge=0),
     limit: int | None = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     sort_by: str = Query(default="order", regex="^(order|last_updated)$"),
     sort_dir: str = Query(default="asc", regex="^(asc|desc)$"),
-    db: AsyncSession = Depends(db_dep),
-) -> List[ChapterOut]:
+    fields: Fields = Depends(fields_query(ChapterOut)),
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
     s, l = paginate_params(skip, limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
-    chapters = await list_chapters(db, volume_id, s, l, sort_by, sort_dir)
-    return [ChapterOut.model_validate(c) for c in chapters]
+    validator = Validator.build(
+        f"chapters?volume_id={volume_id}&skip={s}&limit={l}&sort_by={sort_by}&sort_dir={sort_dir}&fields={fields_key(fields)}",
+        await get_chapter_list_version(db, volume_id, s, l, sort_by, sort_dir),
+    )
+    if validator.matches(request):
+        return validator.not_modified()
+
+    async def render() -> bytes:
+        chapters = await list_chapters(db, volume_id, s, l, sort_by, sort_dir, fields)
+        return sparse_serializer(ChapterOut, fields, many=True).serialize(chapters)
+
+    payload = await cached_payload(validator.etag, render)
+    return validator.apply(await payload.response(request))
 
 
 @router.get(
     "/{chapter_id}",
+    dependencies=[Depends(admit(CHAPTER_READ))],
     response_model=ChapterDetail,
     status_code=status.HTTP_200_OK,
     summary="Get chapter",
-    description="Get a chapter by id",
+    description="Get a chapter by id. Pass `fields` to return only some fields; volume and novel are only loaded when included.",
 )
-async def get_chapter_endpoint(chapter_id: UUID, db: AsyncSession = Depends(db_dep)) -> ChapterDetail:
-    chapter = await get_chapter(db, chapter_id)
-    if not chapter:
+async def get_chapter_endpoint(
+    request: Request,
+    chapter_id: UUID,
+    fields: Fields = Depends(fields_query(ChapterDetail)),
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
+    version = await chapter_version_flight.do(chapter_id, lambda: get_chapter_version(db, chapter_id))
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
+    validator = Validator.build(f"chapter:{chapter_id}?fields={fields_key(fields)}", [version])
+    if validator.matches(request):
+        return validator.not_modified()
+
+    async def render() -> Optional[bytes]:
+        chapter = await get_chapter(db, chapter_id, fields)
+        return sparse_serializer(ChapterDetail, fields).serialize(chapter) if chapter else None
+
+    payload = await cached_payload(validator.etag, render)
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
-    return ChapterDetail.model_validate(chapter)
+    return validator.apply(await payload.response(request))
 
 
 @router.patch(
@@ -3,27 +3,39 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import asc, desc, select
+from sqlalchemy import Row, asc, delete, desc, func, insert, select, update
 
 from src.models import Chapter, Volume, Novel
-from src.chapters.schemas import ChapterCreate, ChapterUpdate
+from src.chapters.schemas import ChapterCreate, ChapterDetail, ChapterOut, ChapterUpdate
+from src.fields import Fields, includes, sparse_model
+from src.tracing import traced
+from src.utils import select_from_schema
 
 
 async def create_chapter(db: AsyncSession, data: ChapterCreate) -> Chapter:
-    chapter = Chapter(
-        volume_id=data.volume_id,
-        title=data.title,
-        order=data.order,
-        meta=data.meta,
-        content=data.content,
+    stmt = (
+        insert(Chapter)
+        .values(
+            volume_id=data.volume_id,
+            title=data.title,
+            order=data.order,
+            meta=data.meta,
+            content=data.content,
+        )
+        .returning(Chapter)
     )
-    db.add(chapter)
+    result = await db.execute(stmt)
+    chapter = result.scalar_one()
     await db.commit()
-    await db.refresh(chapter)
     return chapter
 
 
-async def get_chapter(db: AsyncSession, chapter_id: UUID) -> Optional[Chapter]:
+@traced()
+async def get_chapter(db: AsyncSession, chapter_id: UUID, fields: Fields = None) -> Optional[Chapter]:
+    if not includes(fields, "volume", "novel"):
+        stmt = select_from_schema(Chapter, sparse_model(ChapterDetail, fields)).filter(Chapter.id == chapter_id)
+        result = await db.execute(stmt)
+        return result.mappings().one_or_none()
     stmt = (
         select(Chapter)
         .options(
@@ -35,6 +47,27 @@ async def get_chapter(db: AsyncSession, chapter_id: UUID) -> Optional[Chapter]:
     return result.scalar_one_or_none()
 
 
+def _list_statement(
+    volume_id: Optional[UUID],
+    skip: int,
+    limit: int,
+    sort_by: str,
+    sort_dir: str,
+    stmt,
+):
+    if volume_id:
+        stmt = stmt.filter(Chapter.volume_id == volume_id)
+
+    sort_column = Chapter.order if sort_by == "order" else Chapter.last_updated
+    if sort_dir == "desc":
+        stmt = stmt.order_by(desc(sort_column))
+    else:
+        stmt = stmt.order_by(asc(sort_column))
+
+    return stmt.offset(skip).limit(limit)
+
+
+@traced()
 async def list_chapters(
     db: AsyncSession,
     volume_id: Optional[UUID] = None,
@@ -42,45 +75,61 @@ async def list_chapters(
     limit: int = 20,
     sort_by: str = "order",
     sort_dir: str = "asc",
+    fields: Fields = None,
 ) -> List[Chapter]:
-    stmt = select(Chapter)
-    if volume_id:
-        stmt = stmt.filter(Chapter.volume_id == volume_id)
+    stmt = select_from_schema(Chapter, sparse_model(ChapterOut, fields))
+    result = await db.execute(_list_statement(volume_id, skip, limit, sort_by, sort_dir, stmt))
+    return list(result.mappings().all())
 
-    sort_column = Chapter.order if sort_by == "order" else Chapter.last_updated
-    if sort_dir == "desc":
-        stmt = stmt.order_by(desc(sort_column))
-    else:
-        stmt = stmt.order_by(asc(sort_column))
 
-    stmt = stmt.offset(skip).limit(limit)
+async def get_chapter_list_version(
+    db: AsyncSession,
+    volume_id: Optional[UUID] = None,
+    skip: int = 0,
+    limit: int = 20,
+    sort_by: str = "order",
+    sort_dir: str = "asc",
+) -> List[Row]:
+    """(id, last_updated) of the page `list_chapters` would return, for conditional GET"""
+    result = await db.execute(_list_statement(volume_id, skip, limit, sort_by, sort_dir, select(Chapter.id, Chapter.last_updated)))
+    return list(result.all())
+
+
+async def get_chapter_version(db: AsyncSession, chapter_id: UUID) -> Optional[Row]:
+    """Newest last_updated across the chapter and the volume/novel embedded in its detail"""
+    stmt = (
+        select(func.greatest(Chapter.last_updated, Volume.last_updated, Novel.last_updated))
+        .select_from(Chapter)
+        .join(Volume, Volume.id == Chapter.volume_id)
+        .join(Novel, Novel.id == Volume.novel_id)
+        .filter(Chapter.id == chapter_id)
+    )
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return result.one_or_none()
 
 
 async def update_chapter(db: AsyncSession, chapter_id: UUID, data: ChapterUpdate) -> Optional[Chapter]:
-    chapter = await get_chapter(db, chapter_id)
+    values = {
+        field: value
+        for field, value in data.model_dump(include={"title", "order", "meta", "content"}).items()
+        if value is not None
+    }
+    if not values:
+        result = await db.execute(select(Chapter).filter(Chapter.id == chapter_id))
+        return result.scalar_one_or_none()
+    stmt = update(Chapter).filter(Chapter.id == chapter_id).values(**values).returning(Chapter)
+    result = await db.execute(stmt)
+    chapter = result.scalar_one_or_none()
     if not chapter:
         return None
-    if data.title is not None:
-        chapter.title = data.title
-    if data.order is not None:
-        chapter.order = data.order
-    if data.meta is not None:
-        chapter.meta = data.meta
-    if data.content is not None:
-        chapter.content = data.content
     await db.commit()
-    await db.refresh(chapter)
     return chapter
 
 
 async def delete_chapter(db: AsyncSession, chapter_id: UUID) -> bool:
-    chapter = await get_chapter(db, chapter_id)
-    if not chapter:
+    stmt = delete(Chapter).filter(Chapter.id == chapter_id).returning(Chapter.id)
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
         return False
-    await db.delete(chapter)
     await db.commit()
     return True
-
-
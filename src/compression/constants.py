@@ -0,0 +1,17 @@
+import os
+
+# Bodies smaller than this are sent as is; headers and framing eat the savings
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Server preference when the client accepts several with equal q
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+# Per-request compression favours speed; cached payloads are compressed once and can afford more
+DYNAMIC_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+CACHED_LEVELS = {"zstd": 12, "br": 9, "gzip": 9}
+
+# Serialized responses keyed by their ETag, so a hit is always the current version
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "2000"))
+# Bodies plus their compressed variants; a chapter or full TOC can be hundreds of KB, so entries alone bound nothing
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
@@ -0,0 +1,232 @@
+import zlib
+from typing import Awaitable, Callable, Dict, Optional
+
+import brotli
+import zstandard
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from src.cache import TTLCache
+from src.singleflight import SingleFlight
+from src.compression.constants import (
+    CACHED_LEVELS,
+    COMPRESSIBLE_TYPES,
+    COMPRESSION_MIN_SIZE,
+    DYNAMIC_LEVELS,
+    ENCODING_PREFERENCE,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported coding from Accept-Encoding; None means identity"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODING_PREFERENCE:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def compressor(encoding: str, level: int):
+    """Incremental compressor with compress(data) / flush()"""
+    if encoding == "gzip":
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    if encoding == "br":
+        return _BrotliCompressor(level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    c = compressor(encoding, level)
+    return c.compress(data) + c.flush()
+
+
+def _is_compressible(headers: MutableHeaders, status: int) -> bool:
+    if status < 200 or status in (204, 304) or "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressedPayload:
+    """A serialized body plus its compressed variants, each produced at most once"""
+
+    __slots__ = ("body", "media_type", "on_grow", "_variants")
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str = "application/json",
+        on_grow: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.body = body
+        self.media_type = media_type
+        self.on_grow = on_grow  # Called once a variant is added, so a cache holding it can re-measure
+        self._variants: Dict[str, bytes] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self._variants.values())
+
+    async def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            # At the cached levels a large body takes long enough to stall the event loop
+            variant = await run_in_threadpool(compress, self.body, encoding, CACHED_LEVELS[encoding])
+            self._variants[encoding] = variant
+            if self.on_grow is not None:
+                self.on_grow()
+        return variant
+
+    async def response(self, request: Request, status_code: int = 200) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        if len(self.body) < COMPRESSION_MIN_SIZE:
+            encoding = None
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(await self.encoded(encoding), status_code=status_code, media_type=self.media_type, headers=headers)
+
+
+response_cache: TTLCache[str, CompressedPayload] = TTLCache(
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_TTL_SECONDS,
+    name="response",
+    maxbytes=RESPONSE_CACHE_MAX_BYTES,
+    sizeof=lambda payload: payload.nbytes,
+)
+
+
+render_flight: SingleFlight[str, Optional[CompressedPayload]] = SingleFlight(name="render")
+
+
+async def cached_payload(key: str, render: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[CompressedPayload]:
+    """Serialized response for `key` (a version ETag), rendering it on a miss; None if render finds nothing.
+
+    Concurrent misses for the same key share one render.
+    """
+    payload = response_cache.get(key)
+    if payload is not None:
+        return payload
+
+    async def render_and_store() -> Optional[CompressedPayload]:
+        body = await render()
+        if body is None:
+            return None
+        rendered = CompressedPayload(body, on_grow=lambda: response_cache.resize(key))
+        response_cache.set(key, rendered)
+        return rendered
+
+    return await render_flight.do(key, render_and_store)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/br/zstd for bodies over the size threshold.
+
+    Responses that already carry Content-Encoding (precompressed cache entries)
+    pass through untouched. Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = None
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+
+        start = None
+        stream = None
+
+        async def send_wrapper(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or (start is None and stream is None):
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                data = stream.compress(body)
+                if not more_body:
+                    data += stream.flush()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            start["headers"] = headers.raw
+            pending, start = start, None
+            if not _is_compressible(headers, pending["status"]):
+                await send(pending)
+                await send(message)
+                return
+            _add_vary(headers)
+            if encoding is None or (not more_body and len(body) < self.minimum_size):
+                await send(pending)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                del headers["Content-Length"]
+                stream = compressor(encoding, DYNAMIC_LEVELS[encoding])
+                await send(pending)
+                await send({"type": "http.response.body", "body": stream.compress(body), "more_body": True})
+                return
+            data = compress(body, encoding, DYNAMIC_LEVELS[encoding])
+            headers["Content-Length"] = str(len(data))
+            await send(pending)
+            await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,65 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+
+@dataclass(frozen=True)
+class Validator:
+    """Weak ETag + Last-Modified for a response, built from cheap version metadata.
+
+    `shape` identifies what the response contains (resource id or canonical
+    query); `rows` are the version columns (timestamps, ids, counts) that
+    change whenever the payload does.
+    """
+    etag: str
+    last_modified: Optional[datetime]
+
+    @classmethod
+    def build(cls, shape: str, rows: Iterable[Iterable[Any]]) -> "Validator":
+        digest = hashlib.sha1(shape.encode())
+        stamps = []
+        for row in rows:
+            for value in row:
+                digest.update(b"|" + str(value).encode())
+                if isinstance(value, datetime):
+                    stamps.append(value)
+        return cls(etag=f'W/"{digest.hexdigest()[:32]}"', last_modified=max(stamps, default=None))
+
+    def headers(self) -> Dict[str, str]:
+        # no-cache: clients and CDNs may store it but must revalidate, which is now a 304
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True if the client's cached copy is current (RFC 9110 13.1.2 / 13.1.3)"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTP dates have second resolution
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def not_modified(self) -> Response:
+        # Same Vary as the 200 (set by CompressedPayload / the compression middleware), or a cache
+        # revalidating one encoding could update its stored copy of another
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**self.headers(), "Vary": "Accept-Encoding"})
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
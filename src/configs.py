@@ -0,0 +1,119 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy.engine import make_url
+
+
+def _env(mapping: Dict[str, str]) -> Dict[str, Any]:
+    """Pick the environment variables that are set, keyed by settings field name"""
+    return {field: os.environ[name] for field, name in mapping.items() if os.getenv(name) not in (None, "")}
+
+
+def _with_driver(url: str, driver: str) -> str:
+    return make_url(url).set(drivername=f"postgresql+{driver}").render_as_string(hide_password=False)
+
+
+class DatabaseSettings(BaseModel):
+    url: str = Field(..., description="DATABASE_URL, driver is replaced per engine unless overridden below")
+    sync_url: Optional[str] = Field(default=None, description="psycopg2 URL for scripts/migrations")
+    async_url: Optional[str] = Field(default=None, description="asyncpg URL for the API")
+    replica_urls: List[str] = Field(default_factory=list, description="Read replicas for GET endpoints, comma separated")
+    replica_lag_window_seconds: float = Field(default=5, ge=0, description="Reads go to the primary this long after a client's write")
+    echo: bool = False
+
+    pool_size: int = Field(default=5, ge=1, description="Persistent connections per engine per worker")
+    max_overflow: int = Field(default=10, ge=0, description="Extra connections opened under load")
+    pool_timeout: float = Field(default=30, gt=0, description="Seconds to wait for a connection before failing")
+    pool_pre_ping: bool = True
+    pool_recycle: int = Field(default=1800, description="Recycle connections older than this many seconds, -1 disables")
+    pool_warmup: int = Field(default=2, ge=0, description="Connections opened per async engine at app startup")
+
+    statement_cache_size: int = Field(default=100, ge=0, description="asyncpg prepared statement cache per connection")
+    pgbouncer: bool = Field(default=False, description="PgBouncer transaction pooling: no server-side prepared statement reuse")
+    statement_timeout_ms: Optional[int] = Field(default=None, ge=0, description="Postgres statement_timeout for every connection")
+
+    @field_validator("replica_urls", mode="before")
+    @classmethod
+    def split_urls(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls.model_validate(_env({
+            "url": "DATABASE_URL",
+            "sync_url": "DATABASE_SYNC_URL",
+            "async_url": "DATABASE_ASYNC_URL",
+            "replica_urls": "DATABASE_REPLICA_URLS",
+            "replica_lag_window_seconds": "DB_REPLICA_LAG_WINDOW_SECONDS",
+            "echo": "DB_ECHO",
+            "pool_size": "DB_POOL_SIZE",
+            "max_overflow": "DB_MAX_OVERFLOW",
+            "pool_timeout": "DB_POOL_TIMEOUT",
+            "pool_pre_ping": "DB_POOL_PRE_PING",
+            "pool_recycle": "DB_POOL_RECYCLE",
+            "pool_warmup": "DB_POOL_WARMUP",
+            "statement_cache_size": "DB_STATEMENT_CACHE_SIZE",
+            "pgbouncer": "DB_PGBOUNCER",
+            "statement_timeout_ms": "DB_STATEMENT_TIMEOUT_MS",
+        }))
+
+    @property
+    def resolved_sync_url(self) -> str:
+        return self.sync_url or _with_driver(self.url, "psycopg2")
+
+    @property
+    def resolved_async_url(self) -> str:
+        return self.async_url or _with_driver(self.url, "asyncpg")
+
+    @property
+    def resolved_replica_urls(self) -> List[str]:
+        return [_with_driver(url, "asyncpg") for url in self.replica_urls]
+
+
+class TracingSettings(BaseModel):
+    sample_rate: float = Field(default=0.01, ge=0, le=1, description="Share of requests whose spans are exported")
+    export_path: Optional[str] = Field(default="traces.jsonl", description="OTLP JSON lines file, empty disables export")
+    service_name: str = "novel-recommend"
+
+    @classmethod
+    def from_env(cls) -> "TracingSettings":
+        data = _env({
+            "sample_rate": "TRACE_SAMPLE_RATE",
+            "service_name": "TRACE_SERVICE_NAME",
+        })
+        if "TRACE_EXPORT_PATH" in os.environ:
+            data["export_path"] = os.environ["TRACE_EXPORT_PATH"] or None
+        return cls.model_validate(data)
+
+
+class ServerSettings(BaseModel):
+    host: str = "0.0.0.0"
+    port: int = Field(default=8000, ge=1, le=65535)
+    workers: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=1, description="Worker processes, defaults to CPU count")
+    preload: bool = Field(default=True, description="Import the app once in the master so workers share it copy-on-write")
+    max_requests: int = Field(default=10000, ge=0, description="Recycle a worker after this many requests, 0 disables")
+    max_requests_jitter: int = Field(default=1000, ge=0, description="Random extra requests so workers do not recycle together")
+    graceful_timeout: int = Field(default=30, ge=1, description="Seconds a stopping worker gets to finish in-flight requests")
+    timeout: int = Field(default=60, ge=1, description="Workers silent for longer are killed and replaced")
+    keepalive: int = Field(default=5, ge=0, description="Seconds to hold idle keep-alive connections")
+    backlog: int = Field(default=2048, ge=1)
+    forwarded_allow_ips: Optional[str] = Field(default=None, description="Proxies trusted for X-Forwarded-* headers, comma separated")
+
+    @classmethod
+    def from_env(cls) -> "ServerSettings":
+        return cls.model_validate(_env({
+            "host": "WEB_HOST",
+            "port": "WEB_PORT",
+            "workers": "WEB_WORKERS",
+            "preload": "WEB_PRELOAD",
+            "max_requests": "WEB_MAX_REQUESTS",
+            "max_requests_jitter": "WEB_MAX_REQUESTS_JITTER",
+            "graceful_timeout": "WEB_GRACEFUL_TIMEOUT",
+            "timeout": "WEB_TIMEOUT",
+            "keepalive": "WEB_KEEPALIVE",
+            "backlog": "WEB_BACKLOG",
+            "forwarded_allow_ips": "FORWARDED_ALLOW_IPS",
+        }))
@@ -0,0 +1,26 @@
+"""Prometheus counters, incremented where the events happen.
+
+Running totals live here rather than in src.metrics so the pool, caches, SQL
+instrumentation, singleflight and admission control can count without
+importing the metrics package. In multiprocess mode counter files of exited
+workers keep being summed, so totals never go backwards when a worker is
+recycled.
+"""
+from prometheus_client import Counter
+
+POOL_CHECKOUTS = Counter("db_pool_checkouts", "Connection checkouts", ["pool"])
+POOL_TIMEOUTS = Counter("db_pool_timeouts", "Checkouts that timed out", ["pool"])
+POOL_WAIT = Counter("db_pool_wait_seconds", "Time spent waiting for a connection", ["pool"])
+
+CACHE_HITS = Counter("cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses", "Cache misses", ["cache"])
+
+SQL_QUERIES = Counter("sql_queries", "SQL statements run per route", ["route"])
+SQL_SECONDS = Counter("sql_seconds", "Time spent in SQL per route", ["route"])
+SQL_N_PLUS_ONE = Counter("sql_n_plus_one_requests", "Requests with a repeated statement", ["route"])
+
+# Coalescing ratio = followers / (leaders + followers)
+SINGLEFLIGHT_LEADERS = Counter("singleflight_leaders", "Computations actually run", ["flight"])
+SINGLEFLIGHT_FOLLOWERS = Counter("singleflight_followers", "Calls that shared an in-flight computation", ["flight"])
+
+ADMISSION_SHED = Counter("admission_shed", "Requests answered 503 by admission control", ["route_class", "reason"])
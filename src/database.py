@@ -1,16 +1,232 @@
-import os
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+from uuid import uuid4
+
+from fastapi import Request, Response
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.configs import DatabaseSettings
+from src.counters import POOL_CHECKOUTS, POOL_TIMEOUTS, POOL_WAIT
+
+
+# -------------------- POOL METRICS --------------------
+@dataclass
+class PoolStats:
+    pool: str  # Label in pool_metrics() and the Prometheus counters
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+            POOL_TIMEOUTS.labels(self.pool).inc()
+        else:
+            self.checkouts += 1
+            POOL_CHECKOUTS.labels(self.pool).inc()
+        self.wait_seconds_total += waited
+        POOL_WAIT.labels(self.pool).inc(waited)
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout; `stats` lives on the class so it survives pool.recreate()"""
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+
+def _instrumented_pool(base: Type[Pool], name: str, label: str) -> Type[Pool]:
+    return type(name, (_InstrumentedPoolMixin, base), {"stats": PoolStats(label)})
+
+
+def _pool_kwargs(s: DatabaseSettings) -> Dict[str, Any]:
+    return {
+        "pool_size": s.pool_size,
+        "max_overflow": s.max_overflow,
+        "pool_timeout": s.pool_timeout,
+        "pool_pre_ping": s.pool_pre_ping,
+        "pool_recycle": s.pool_recycle,
+    }
+
+
+def _sync_connect_args(s: DatabaseSettings) -> Dict[str, Any]:
+    if s.statement_timeout_ms is None:
+        return {}
+    return {"options": f"-c statement_timeout={s.statement_timeout_ms}"}
+
+
+def _async_connect_args(s: DatabaseSettings) -> Dict[str, Any]:
+    cache_size = 0 if s.pgbouncer else s.statement_cache_size
+    args: Dict[str, Any] = {
+        "statement_cache_size": cache_size,  # asyncpg's own cache
+        "prepared_statement_cache_size": cache_size,  # SQLAlchemy adapter cache
+    }
+    if s.pgbouncer:
+        # Transaction pooling hands each transaction a different server connection,
+        # so prepared statement names must never collide
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    if s.statement_timeout_ms is not None:
+        args["server_settings"] = {"statement_timeout": str(s.statement_timeout_ms)}
+    return args
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> DatabaseSettings:
+    return DatabaseSettings.from_env()
+
+
+# Engines are built on first use (or by init_database() in the app lifespan),
+# so importing this module for Base/models costs nothing
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    s = get_settings()
+    return create_engine(
+        s.resolved_sync_url,
+        echo=s.echo,
+        poolclass=_instrumented_pool(QueuePool, "SyncPool", "sync"),
+        connect_args=_sync_connect_args(s),
+        **_pool_kwargs(s),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    s = get_settings()
+    return create_async_engine(
+        s.resolved_async_url,
+        echo=s.echo,
+        poolclass=_instrumented_pool(AsyncAdaptedQueuePool, "AsyncPool", "async"),
+        connect_args=_async_connect_args(s),
+        **_pool_kwargs(s),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_replica_engines() -> List[AsyncEngine]:
+    s = get_settings()
+    return [
+        create_async_engine(
+            url,
+            echo=s.echo,
+            poolclass=_instrumented_pool(AsyncAdaptedQueuePool, f"ReplicaPool{i}", f"replica{i}"),
+            connect_args=_async_connect_args(s),
+            **_pool_kwargs(s),
+        )
+        for i, url in enumerate(s.resolved_replica_urls)
+    ]
+
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+class _LazySessionFactory:
+    """Callable like a sessionmaker, but only builds it (and its engine) on first call"""
 
-engine = create_engine(DATABASE_URL, echo=False)
-async_engine = create_async_engine(DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=async_engine,class_=AsyncSession)
+    def __init__(self, build: Callable[[], sessionmaker]) -> None:
+        self._build = build
+        self._factory: Optional[sessionmaker] = None
+
+    def __call__(self, **kwargs):
+        if self._factory is None:
+            self._factory = self._build()
+        return self._factory(**kwargs)
+
+
+SessionLocal = _LazySessionFactory(
+    lambda: sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+)
+# expire_on_commit=False: objects written with INSERT/UPDATE ... RETURNING stay
+# readable after commit without a refresh SELECT
+AsyncSessionLocal = _LazySessionFactory(
+    lambda: sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=get_async_engine(), class_=AsyncSession
+    )
+)
 Base = declarative_base()
 
+
+@lru_cache(maxsize=1)
+def _replica_cycle() -> Optional[Iterator[sessionmaker]]:
+    factories = [
+        sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=e, class_=AsyncSession)
+        for e in get_replica_engines()
+    ]
+    return itertools.cycle(factories) if factories else None
+
+
+# Set on responses to writes; while present the client reads from the primary,
+# so it sees its own write even if replicas lag behind
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+
+
+async def _warm_up(async_engine: AsyncEngine, connections: int) -> None:
+    async def connect_once() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(connect_once() for _ in range(connections)))
+
+
+async def init_database() -> None:
+    """Build the API's async engines and open `pool_warmup` connections on each"""
+    s = get_settings()
+    engines = [get_async_engine(), *get_replica_engines()]
+    warmup = min(s.pool_warmup, s.pool_size)
+    if warmup:
+        await asyncio.gather(*(_warm_up(e, warmup) for e in engines))
+
+
+async def close_database() -> None:
+    """Dispose every engine that was created"""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    if get_replica_engines.cache_info().currsize:
+        for e in get_replica_engines():
+            await e.dispose()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+
+
+def pool_metrics() -> Dict[str, Dict[str, float]]:
+    """Current pool occupancy plus cumulative checkout/wait stats per engine"""
+    metrics = {}
+    pools = []
+    if get_engine.cache_info().currsize:
+        pools.append(("sync", get_engine().pool))
+    if get_async_engine.cache_info().currsize:
+        pools.append(("async", get_async_engine().sync_engine.pool))
+    if get_replica_engines.cache_info().currsize:
+        pools += [(f"replica{i}", e.sync_engine.pool) for i, e in enumerate(get_replica_engines())]
+    for name, pool in pools:
+        stats: PoolStats = pool.stats
+        metrics[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_seconds_total": stats.wait_seconds_total,
+            "wait_seconds_max": stats.wait_seconds_max,
+        }
+    return metrics
+
+
 # Dependency cho FastAPI
 def get_db():
     db = SessionLocal()
@@ -20,7 +236,51 @@ def get_db():
         db.close()
 
 
-async def get_async_db():
+async def get_async_db(request: Request, response: Response):
+    if _replica_cycle() is not None and request.method not in ("GET", "HEAD", "OPTIONS"):
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            "1",
+            max_age=max(1, int(get_settings().replica_lag_window_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
     async with AsyncSessionLocal() as db:
         yield db
-  
\ No newline at end of file
+
+
+def background_read_session() -> AsyncSession:
+    """Read session for work outside a request (no primary pin): next replica, else the primary"""
+    replicas = _replica_cycle()
+    session_factory = AsyncSessionLocal if replicas is None else next(replicas)
+    db = session_factory()
+    db.info["replica"] = session_factory is not AsyncSessionLocal
+    return db
+
+
+def shareable_read(db: AsyncSession, changed_at: float) -> bool:
+    """Whether rows read through `db` may be cached for other clients.
+
+    Not when the read was pinned to the primary (the client's own fresh write),
+    nor when it came from a replica that may not have the change made at
+    `changed_at` (time.monotonic()) yet.
+    """
+    if db.info.get("pinned"):
+        return False
+    if db.info.get("replica"):
+        return time.monotonic() - changed_at >= get_settings().replica_lag_window_seconds
+    return True
+
+
+async def get_async_read_db(request: Request):
+    """Read-only session: round-robin over replicas, primary when none or right after a write"""
+    replicas = _replica_cycle()
+    pinned = replicas is not None and bool(request.cookies.get(PRIMARY_PIN_COOKIE))
+    if replicas is None or pinned:
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = next(replicas)
+    async with session_factory() as db:
+        db.info["pinned"] = pinned
+        db.info["replica"] = session_factory is not AsyncSessionLocal
+        yield db
@@ -0,0 +1,6 @@
+class ServiceBusyError(Exception):
+    """Raised when a bounded resource refuses more work; answered with 503 + Retry-After"""
+
+    def __init__(self, message: str = "Service is busy, retry later", retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
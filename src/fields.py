@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, Field, create_model
+
+from src.serialization import Serializer
+
+# Requested field names, sorted; None means the whole schema
+Fields = Optional[Tuple[str, ...]]
+
+ALWAYS_INCLUDED = ("id",)
+
+
+def parse_fields(value: Union[None, str, Iterable[str]], schema: Type[BaseModel]) -> Fields:
+    """`fields=id,title` (or the parameter repeated) as a canonical tuple of `schema` field names"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    names = {name.strip() for item in value for name in item.split(",") if name.strip()}
+    if not names:
+        return None
+    unknown = names - schema.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names.update(name for name in ALWAYS_INCLUDED if name in schema.model_fields)
+    return tuple(sorted(names))
+
+
+def fields_query(schema: Type[BaseModel]) -> Callable[..., Fields]:
+    """Dependency reading an optional `fields` query parameter for `schema`"""
+    description = f"Comma separated fields to return, of: {', '.join(schema.model_fields)} (id is always returned)"
+
+    def dependency(fields: Optional[str] = Query(default=None, description=description)) -> Fields:
+        try:
+            return parse_fields(fields, schema)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    return dependency
+
+
+def includes(fields: Fields, *names: str) -> bool:
+    """Whether `fields` asks for any of `names`"""
+    return fields is None or any(name in fields for name in names)
+
+
+def fields_key(fields: Fields) -> str:
+    return "" if fields is None else ",".join(fields)
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], fields: Fields) -> Type[BaseModel]:
+    """`schema` with every field outside `fields` optional and left out of the output.
+
+    Config and validators are inherited, so it accepts the same ORM objects as
+    `schema` as well as row mappings holding only the selected columns.
+    """
+    if fields is None:
+        return schema
+    dropped = {
+        name: (Any, Field(default=None, exclude=True))
+        for name in schema.model_fields
+        if name not in fields
+    }
+    return create_model(f"{schema.__name__}Sparse", __base__=schema, **dropped)
+
+
+@lru_cache(maxsize=256)
+def sparse_serializer(schema: Type[BaseModel], fields: Fields, many: bool = False) -> Serializer:
+    model = sparse_model(schema, fields)
+    return Serializer(List[model] if many else model)
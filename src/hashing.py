@@ -0,0 +1,79 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from src.exceptions import ServiceBusyError
+
+_contexts: Dict[int, CryptContext] = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    ctx = _contexts.get(rounds)
+    if ctx is None:
+        # min == max == default: any hash with another cost is flagged for rehash
+        ctx = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+        _contexts[rounds] = ctx
+    return ctx
+
+
+def hash_secret(secret: str, rounds: int) -> str:
+    return _context(rounds).hash(secret)
+
+
+def verify_and_update(secret: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """Return (valid, new_hash); new_hash is set when `hashed` was made with another cost"""
+    return _context(rounds).verify_and_update(secret, hashed)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool so it never blocks the event loop.
+
+    At most `max_pending` operations may be queued or running per worker process;
+    beyond that callers get ServiceBusyError instead of waiting behind a login burst.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB pools is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise ServiceBusyError("Too many concurrent password operations, retry later")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, secret: str) -> str:
+        return await self._submit(hash_secret, secret, self.rounds)
+
+    async def verify(self, secret: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit(verify_and_update, secret, hashed, self.rounds)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
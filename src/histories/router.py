@@ -1,11 +1,11 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.histories.schemas import HistoryCreate, HistoryDetail, HistoryOut
-from src.histories.dependencies import db_dep
+from src.histories.dependencies import db_dep, read_db_dep
 from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.histories.service import (
     create_history,
@@ -18,6 +18,8 @@ from src.histories.service import (
 )
 from src.pagination import paginate_params
 from src.users.dependencies import CurrentUser
+from src.admission.dependencies import BROWSE, WRITE, admit
+from src.fields import Fields, fields_query, sparse_serializer
 
 
 router = APIRouter(prefix="/histories", tags=["histories"])
@@ -25,6 +27,7 @@ router = APIRouter(prefix="/histories", tags=["histories"])
 
 @router.post(
     "",
+    dependencies=[Depends(admit(WRITE))],
     response_model=HistoryOut,
     status_code=status.HTTP_201_CREATED,
     summary="Create history",
@@ -41,21 +44,23 @@ async def create_history_endpoint(
 
 @router.get(
     "",
+    dependencies=[Depends(admit(BROWSE))],
     response_model=List[HistoryDetail],
     status_code=status.HTTP_200_OK,
     summary="List histories",
-    description="List reading history for the current user.",
+    description="List reading history for the current user. Pass `fields` to return only some fields; novel and chapter are only loaded when included.",
 )
 async def list_histories_endpoint(
     current_user: CurrentUser,
     novel_id: Optional[UUID] = Query(default=None),
     skip: int | None = Query(default=0, ge=0),
     limit: int | None = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
-    db: AsyncSession = Depends(db_dep),
-) -> List[HistoryDetail]:
+    fields: Fields = Depends(fields_query(HistoryDetail)),
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
     s, l = paginate_params(skip, limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
-    histories = await list_histories(db, current_user.id, s, l, novel_id)
-    return [HistoryDetail.model_validate(h) for h in histories]
+    histories = await list_histories(db, current_user.id, s, l, novel_id, fields)
+    return sparse_serializer(HistoryDetail, fields, many=True).response(histories)
 
 
 @router.get(
@@ -68,7 +73,7 @@ async def list_histories_endpoint(
 async def get_last_read_chapter_endpoint(
     novel_id: UUID,
     current_user: CurrentUser,
-    db: AsyncSession = Depends(db_dep)
+    db: AsyncSession = Depends(read_db_dep)
 ) -> HistoryDetail:
     history = await get_last_read_chapter(db, current_user.id, novel_id)
     if not history:
@@ -89,7 +94,7 @@ async def get_last_read_chapter_endpoint(
 async def get_history_endpoint(
     history_id: UUID,
     current_user: CurrentUser,
-    db: AsyncSession = Depends(db_dep)
+    db: AsyncSession = Depends(read_db_dep)
 ) -> HistoryDetail:
     history = await get_history(db, history_id, current_user.id)
     if not history:
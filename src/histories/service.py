@@ -1,39 +1,36 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 from datetime import datetime, timedelta
 from src.chapters import service as chapter_service
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import desc, and_, select
+from sqlalchemy.orm import noload, selectinload
+from sqlalchemy import any_, bindparam, delete, desc, and_, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 
 from src.models import History, Novel, Chapter
-from src.histories.schemas import HistoryCreate
+from src.histories.schemas import HistoryCreate, HistoryDetail
+from src.fields import Fields, includes, sparse_model
+from src.utils import select_from_schema
 
 
 async def create_history(db: AsyncSession, user_id: UUID, data: HistoryCreate) -> History:
     """Create or update reading history"""
-    # Check if history already exists for this user, novel, and chapter
-    stmt = select(History).filter(
-        History.user_id == user_id,
-        History.novel_id == data.novel_id,
-        History.chapter_id == data.chapter_id,
+    # Drop the previous entry for this chapter so the new one carries the latest timestamp
+    await db.execute(
+        delete(History).filter(
+            History.user_id == user_id,
+            History.novel_id == data.novel_id,
+            History.chapter_id == data.chapter_id,
+        )
     )
-    result = await db.execute(stmt)
-    existing = result.scalar_one_or_none()
-    
-    if existing:
-        # Update timestamp by deleting and recreating
-        await db.delete(existing)
-        await db.commit()
-    
-    history = History(
-        user_id=user_id,
-        novel_id=data.novel_id,
-        chapter_id=data.chapter_id,
+    stmt = (
+        insert(History)
+        .values(user_id=user_id, novel_id=data.novel_id, chapter_id=data.chapter_id)
+        .returning(History)
     )
-    db.add(history)
+    result = await db.execute(stmt)
+    history = result.scalar_one()
     await db.commit()
-    await db.refresh(history)
     return history
 
 
@@ -57,19 +54,25 @@ async def list_histories(
     skip: int = 0,
     limit: int = 20,
     novel_id: Optional[UUID] = None,
+    fields: Fields = None,
 ) -> List[History]:
-    """List reading history for a user"""
-    stmt = select(History).options(
-        selectinload(History.novel),
-        selectinload(History.chapter)
-    ).filter(History.user_id == user_id)
+    """List reading history for a user; with `fields`, only what they need is loaded"""
+    with_relations = includes(fields, "novel", "chapter")
+    if with_relations:
+        stmt = select(History).options(
+            selectinload(History.novel) if includes(fields, "novel") else noload(History.novel),
+            selectinload(History.chapter) if includes(fields, "chapter") else noload(History.chapter),
+        )
+    else:
+        stmt = select_from_schema(History, sparse_model(HistoryDetail, fields))
+    stmt = stmt.filter(History.user_id == user_id)
     
     if novel_id:
         stmt = stmt.filter(History.novel_id == novel_id)
     
     stmt = stmt.order_by(desc(History.created_at)).offset(skip).limit(limit)
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.scalars().all() if with_relations else result.mappings().all())
 
 
 async def get_last_read_chapter(db: AsyncSession, user_id: UUID, novel_id: UUID) -> Optional[History]:
@@ -87,54 +90,63 @@ async def get_last_read_chapter(db: AsyncSession, user_id: UUID, novel_id: UUID)
     return result.scalars().first()
 
 
+async def get_last_read_chapter_ids(
+    db: AsyncSession,
+    user_id: UUID,
+    novel_ids: Sequence[UUID],
+) -> Dict[UUID, UUID]:
+    """Map each of `novel_ids` the user has read to its last read chapter_id (one query via ix_histories_user_novel)"""
+    if not novel_ids:
+        return {}
+    stmt = (
+        select(History.novel_id, History.chapter_id)
+        .distinct(History.novel_id)
+        .filter(
+            History.user_id == user_id,
+            History.novel_id == any_(bindparam("novel_ids", list(novel_ids), type_=ARRAY(PG_UUID))),
+        )
+        .order_by(History.novel_id, desc(History.created_at))
+    )
+    result = await db.execute(stmt)
+    return {row.novel_id: row.chapter_id for row in result.all()}
+
+
 async def delete_history(db: AsyncSession, history_id: UUID, user_id: UUID) -> bool:
     """Delete a history entry"""
-    stmt = select(History).filter(
-        History.id == history_id,
-        History.user_id == user_id
+    stmt = (
+        delete(History)
+        .filter(History.id == history_id, History.user_id == user_id)
+        .returning(History.id)
     )
     result = await db.execute(stmt)
-    history = result.scalar_one_or_none()
-    
-    if not history:
+    if result.scalar_one_or_none() is None:
         return False
-    
-    await db.delete(history)
+
     await db.commit()
     return True
 
 
 async def delete_all_history(db: AsyncSession, user_id: UUID) -> bool:
     """Delete all history for a user"""
-    stmt = select(History).filter(History.user_id == user_id)
+    stmt = delete(History).filter(History.user_id == user_id).returning(History.id)
     result = await db.execute(stmt)
-    histories = list(result.scalars().all())
-    
-    if not histories:
+    if not result.scalars().all():
         return False
-    
-    for history in histories:
-        await db.delete(history)
-    
+
     await db.commit()
     return True
 
 
 async def delete_history_by_novel(db: AsyncSession, user_id: UUID, novel_id: UUID) -> bool:
     """Delete all history entries for a specific novel"""
-    stmt = select(History).filter(
-        History.user_id == user_id,
-        History.novel_id == novel_id
+    stmt = (
+        delete(History)
+        .filter(History.user_id == user_id, History.novel_id == novel_id)
+        .returning(History.id)
     )
     result = await db.execute(stmt)
-    histories = list(result.scalars().all())
-    
-    if not histories:
+    if not result.scalars().all():
         return False
-    
-    for history in histories:
-        await db.delete(history)
-    
+
     await db.commit()
     return True
-
@@ -0,0 +1,150 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.counters import SQL_N_PLUS_ONE, SQL_QUERIES, SQL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# The same statement this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+
+@dataclass
+class RequestSqlStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        return {fp: n for fp, n in self.fingerprints.items() if n >= threshold}
+
+
+@dataclass
+class RouteSqlStats:
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    n_plus_one_requests: int = 0
+
+
+_current: ContextVar[Optional[RequestSqlStats]] = ContextVar("request_sql_stats", default=None)
+_routes: Dict[str, RouteSqlStats] = {}
+
+
+def _fingerprint(statement: str) -> str:
+    # Statements are already parameterized, only whitespace differs between call sites
+    return " ".join(statement.split())[:200]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.db_seconds += time.perf_counter() - starts.pop()
+    stats.queries += 1
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount is None or rowcount < 0:
+        rowcount = len(getattr(cursor, "_rows", None) or ())  # asyncpg adapter reports -1 for SELECT
+    stats.rows += rowcount
+    stats.fingerprints[_fingerprint(statement)] += 1
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute, its start would be left on the pooled connection
+    if context.connection is None or context.execution_context is None:
+        return
+    starts = context.connection.info.get("query_start")
+    if not starts:
+        return
+    start = starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.db_seconds += time.perf_counter() - start
+        stats.queries += 1
+
+
+def install_sql_instrumentation() -> None:
+    """Listen on every Engine (sync engines behind async ones included); no-op outside requests"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def _record(route: str, stats: RequestSqlStats) -> None:
+    agg = _routes.get(route)
+    if agg is None:
+        agg = _routes[route] = RouteSqlStats()
+    agg.requests += 1
+    agg.queries += stats.queries
+    agg.max_queries = max(agg.max_queries, stats.queries)
+    agg.db_seconds += stats.db_seconds
+    agg.rows += stats.rows
+    SQL_QUERIES.labels(route).inc(stats.queries)
+    SQL_SECONDS.labels(route).inc(stats.db_seconds)
+    repeated = stats.repeated()
+    if repeated:
+        agg.n_plus_one_requests += 1
+        SQL_N_PLUS_ONE.labels(route).inc()
+        for fp, n in repeated.items():
+            logger.warning("Possible N+1 on %s: %dx %s", route, n, fp)
+
+
+def sql_metrics() -> Dict[str, RouteSqlStats]:
+    """Aggregated SQL stats per route template since process start"""
+    return dict(_routes)
+
+
+class SqlInstrumentationMiddleware:
+    """Collects SQL stats per request, adds a Server-Timing header and aggregates them per route"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+                    f"app;dur={app_ms:.2f}"
+                )
+                repeated = stats.repeated()
+                if repeated:
+                    timing += f', nplus1;desc="{max(repeated.values())}x same statement"'
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            _record(getattr(route, "path", "unmatched"), stats)
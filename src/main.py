@@ -1,4 +1,12 @@
-from fastapi import FastAPI
+import time
+
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 load_dotenv()
 import uvicorn
@@ -7,16 +15,73 @@ from src.chapters.router import router as chapters_router
 from src.users.router import router as users_router
 from src.bookmarks.router import router as bookmarks_router
 from src.histories.router import router as histories_router
+from src.metrics.router import router as metrics_router
+from src.profiling.router import router as profiling_router
+from src.bookmarks.utils import position_store
+from src.database import close_database, init_database
+from src.notifications import notification_listener
+from src.novels.service import cancel_count_refreshes
+from src.users.utils import password_hasher
+from src.exceptions import ServiceBusyError
+from src.instrumentation import SqlInstrumentationMiddleware, install_sql_instrumentation
+from src.tracing import TracingMiddleware, install_db_tracing, shutdown_tracing
+from src.metrics.utils import MetricsMiddleware, loop_monitor
+from src.profiling.utils import ProfilingMiddleware
+from src.compression.utils import CompressionMiddleware
+from src.utils import StepTimer
+
+logger = logging.getLogger("uvicorn.error")
+_import_seconds = time.perf_counter() - _import_started
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    timer = StepTimer()
+    timer.steps.append(("imports", _import_seconds))
+    with timer.step("database"):
+        await init_database()
+    notification_listener.start()
+    with timer.step("position_store"):
+        position_store.start()
+    loop_monitor.start()
+    app.state.startup_timings = timer.as_dict()
+    logger.info("Startup: %s", timer.report())
+    yield
+    await loop_monitor.stop()
+    await notification_listener.stop()
+    await position_store.close()
+    await cancel_count_refreshes()
+    password_hasher.shutdown()
+    await close_database()
+    shutdown_tracing()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Novel Recommend API", version="0.1.0")
+    app = FastAPI(title="Novel Recommend API", version="0.1.0", lifespan=lifespan)
+
+    install_sql_instrumentation()
+    install_db_tracing()
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(SqlInstrumentationMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(ProfilingMiddleware)
 
     app.include_router(novels_router,prefix="/api")
     app.include_router(chapters_router,prefix="/api")
     app.include_router(users_router,prefix="/api")
     app.include_router(bookmarks_router,prefix="/api")
     app.include_router(histories_router,prefix="/api")
+    app.include_router(profiling_router,prefix="/api")
+    app.include_router(metrics_router)
+
+    @app.exception_handler(ServiceBusyError)
+    async def service_busy_handler(request: Request, exc: ServiceBusyError) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
 
     return app
 
@@ -0,0 +1,11 @@
+import os
+
+# Set to a writable, per-deployment empty directory when running several workers
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+GAUGE_REFRESH_EVERY = 10  # Refresh pool/cache/admission gauges every N loop-lag probes
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from src.metrics.utils import refresh_gauges, registry
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Prometheus metrics",
+    description="Metrics of all workers in Prometheus text format.",
+    include_in_schema=False,
+)
+async def metrics_endpoint() -> Response:
+    refresh_gauges()
+    return Response(content=generate_latest(registry()), media_type=CONTENT_TYPE_LATEST)
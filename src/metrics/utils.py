@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram, REGISTRY, multiprocess
+
+from src.admission.utils import admission
+from src.cache import caches
+from src.database import pool_metrics
+from src.metrics.constants import (
+    GAUGE_REFRESH_EVERY,
+    LATENCY_BUCKETS,
+    LOOP_LAG_BUCKETS,
+    LOOP_LAG_INTERVAL_SECONDS,
+    PROMETHEUS_MULTIPROC_DIR,
+    RESPONSE_SIZE_BUCKETS,
+)
+
+# In multiprocess mode gauges are per-process files; "livesum" adds up live workers
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"], buckets=RESPONSE_SIZE_BUCKETS
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served", multiprocess_mode="livesum")
+LOOP_LAG = Histogram("event_loop_lag_seconds", "Delay of a scheduled wake-up on the event loop", buckets=LOOP_LAG_BUCKETS)
+
+# Point-in-time values only; running totals (checkouts, cache hits, SQL time, coalescing, shedding)
+# are Counters in src.counters, incremented as they happen
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use", ["pool"], multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections above pool_size", ["pool"], multiprocess_mode="livesum")
+CACHE_SIZE = Gauge("cache_entries", "Entries held", ["cache"], multiprocess_mode="livesum")
+
+ADMISSION_ACTIVE = Gauge("admission_active", "Requests holding an admission slot", ["route_class"], multiprocess_mode="livesum")
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for a slot", ["route_class"], multiprocess_mode="livesum")
+
+
+def refresh_gauges() -> None:
+    """Copy this worker's point-in-time pool, cache and admission values into its gauges"""
+    for name, m in pool_metrics().items():
+        POOL_CHECKED_OUT.labels(name).set(m["checked_out"])
+        POOL_OVERFLOW.labels(name).set(max(0, m["overflow"]))
+    for name, cache in caches.items():
+        CACHE_SIZE.labels(name).set(len(cache))
+    for name, stats in admission.stats.items():
+        ADMISSION_ACTIVE.labels(name).set(stats.active)
+        ADMISSION_QUEUED.labels(name).set(stats.queued)
+
+
+def registry() -> CollectorRegistry:
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    reg = CollectorRegistry()
+    multiprocess.MultiProcessCollector(reg)
+    return reg
+
+
+class _LoopMonitor:
+    """Measures event loop lag and keeps the per-worker gauges fresh for other workers' scrapes"""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        probes = 0
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+            LOOP_LAG.observe(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL_SECONDS))
+            probes += 1
+            if probes % GAUGE_REFRESH_EVERY == 0:
+                refresh_gauges()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if PROMETHEUS_MULTIPROC_DIR:
+            multiprocess.mark_process_dead(os.getpid())
+
+
+loop_monitor = _LoopMonitor()
+
+
+class MetricsMiddleware:
+    """Latency, size and in-flight metrics per route template"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_path, str(status_code)).observe(time.perf_counter() - start)
+            RESPONSE_SIZE.labels(method, route_path).observe(size)
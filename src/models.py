@@ -81,7 +81,7 @@ class Chapter(Base):
     order = Column(Integer)
     meta = Column(JSONB)
     content = Column(String)
-    last_updated = Column(DateTime(timezone=True), server_default=func.now())
+    last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     total_views = Column(Integer, default=0)
 
@@ -125,6 +125,7 @@ class Bookmark(Base):
     chapter_id = Column(UUID, ForeignKey("chapters.id"), nullable=True, index=True)  # Index cho JOIN
     line = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Index cho sort
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())  # Last-writer-wins cho sync
 
     # Relationships
     user = relationship("User")
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.database import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Called with the NOTIFY payload, or None when notifications may have been missed
+Handler = Callable[[Optional[str]], None]
+
+LISTEN_RETRY_MIN_SECONDS = 1
+LISTEN_RETRY_MAX_SECONDS = 30
+LISTEN_HEALTH_CHECK_SECONDS = 60  # Idle connections are pinged, a half-open socket never reports itself
+
+
+def _listen_dsn() -> str:
+    return make_url(get_settings().resolved_async_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class NotificationListener:
+    """Postgres LISTEN for cache invalidations sent by other workers, on one connection per worker.
+
+    The connection is opened with asyncpg directly, outside the engine's pool, so
+    it does not take one of the request connections. When it drops it is reopened
+    with backoff, and every handler is called with None since notifications sent
+    meanwhile are lost. LISTEN cannot work through PgBouncer transaction pooling;
+    caches then rely on their TTL alone.
+    """
+
+    def __init__(
+        self,
+        retry_min: float = LISTEN_RETRY_MIN_SECONDS,
+        retry_max: float = LISTEN_RETRY_MAX_SECONDS,
+        health_check: float = LISTEN_HEALTH_CHECK_SECONDS,
+    ) -> None:
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.health_check = health_check
+        self._handlers: Dict[str, Handler] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """Register `handler` for `channel`; takes effect on the next (re)connect"""
+        self._handlers[channel] = handler
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def start(self) -> None:
+        if self._task is not None or not self._handlers:
+            return
+        if get_settings().pgbouncer:
+            logger.warning("DB_PGBOUNCER is set, no LISTEN: cross-worker cache invalidation relies on TTLs only")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        self._handlers[channel](payload)
+
+    async def _run(self) -> None:
+        delay = self.retry_min
+        missed = False
+        while True:
+            try:
+                conn = await asyncpg.connect(_listen_dsn())
+            except Exception as e:
+                logger.warning("LISTEN connection failed (%s), retrying in %.0fs", e, delay)
+                missed = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max)
+                continue
+            failed = False
+            try:
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                for channel in self._handlers:
+                    await conn.add_listener(channel, self._dispatch)
+                self._conn = conn
+                delay = self.retry_min
+                if missed:
+                    for handler in self._handlers.values():
+                        handler(None)
+                await self._watch(conn, lost)
+                logger.warning("LISTEN connection lost, reconnecting")
+            except Exception:
+                logger.exception("LISTEN connection failed, reconnecting in %.0fs", delay)
+                failed = True
+            finally:
+                self._conn = None
+                missed = True
+                if not conn.is_closed():
+                    conn.terminate()
+            if failed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max)
+
+    async def _watch(self, conn: asyncpg.Connection, lost: asyncio.Event) -> None:
+        """Return once the connection is gone"""
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=self.health_check)
+            except asyncio.TimeoutError:
+                await conn.fetchval("SELECT 1", timeout=self.health_check)
+
+
+notification_listener = NotificationListener()
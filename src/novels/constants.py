@@ -0,0 +1,15 @@
+import os
+
+
+# Browse/search page cache, keyed by the canonical NovelQuery
+NOVEL_LIST_CACHE_TTL_SECONDS = float(os.getenv("NOVEL_LIST_CACHE_TTL_SECONDS", "30"))
+NOVEL_LIST_CACHE_MAX_SIZE = int(os.getenv("NOVEL_LIST_CACHE_MAX_SIZE", "1000"))
+NOVEL_LIST_INVALIDATION_CHANNEL = "novel_list_invalidate"  # Postgres NOTIFY channel shared by all workers
+
+
+# X-Total-Count
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_MODE_HEADER = "X-Total-Count-Mode"  # exact, estimate or cached
+TOTAL_COUNT_EXACT_THRESHOLD = int(os.getenv("TOTAL_COUNT_EXACT_THRESHOLD", "10000"))  # Planner estimates below this are counted exactly
+NOVEL_COUNT_CACHE_TTL_SECONDS = float(os.getenv("NOVEL_COUNT_CACHE_TTL_SECONDS", "300"))
+NOVEL_COUNT_CACHE_MAX_SIZE = int(os.getenv("NOVEL_COUNT_CACHE_MAX_SIZE", "1000"))
@@ -1,26 +1,51 @@
-from typing import Annotated, List
+from contextlib import nullcontext
+from typing import Annotated, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.novels.schemas import NovelBrief, NovelCreate, NovelDetail, NovelOut, NovelQuery, NovelUpdate
-from src.novels.dependencies import db_dep
+from src.novels.dependencies import db_dep, read_db_dep
 from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.novels.service import (
     create_novel,
     delete_novel,
     get_novel,
     get_novel_detail,
-    get_novel_by_title,
+    get_novel_detail_version,
+    get_novel_list_version,
+    canonical_query,
+    count_novels,
     list_novels,
+    may_cache_novel_lists,
+    novel_list_cache,
+    novel_list_generation,
+    novel_list_key,
     update_novel,
 )
 from src.pagination import paginate_params
+from src.novels.exceptions import NovelConflictError
+from src.novels.constants import TOTAL_COUNT_HEADER, TOTAL_COUNT_MODE_HEADER
+from src.bookmarks import service as bookmark_service
+from src.histories import service as history_service
+from src.users.dependencies import OptionalCurrentUser
+from src.users.schemas import Principal
+from src.fields import Fields, fields_key, fields_query, sparse_serializer
+from src.conditional import Validator
+from src.compression.utils import CompressedPayload, cached_payload
+from src.singleflight import SingleFlight
+from src.admission.dependencies import BROWSE, SEARCH, admit
+from src.admission.utils import admission
 
 
 router = APIRouter(prefix="/novels", tags=["novels"])
 
+# Identical requests arriving together share one version lookup / page load (renders coalesce in cached_payload)
+novel_version_flight: SingleFlight[UUID, Optional[Row]] = SingleFlight(name="novel_version")
+novel_list_flight: SingleFlight[str, Tuple[Validator, CompressedPayload]] = SingleFlight(name="novel_list")
+
 
 @router.post(
     "",
@@ -30,10 +55,10 @@ router = APIRouter(prefix="/novels", tags=["novels"])
     description="Create a new novel record.",
 )
 async def create_novel_endpoint(data: NovelCreate, db: AsyncSession = Depends(db_dep)) -> NovelOut:
-    existing = await get_novel_by_title(db, data.title)
-    if existing:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Novel title already exists")
-    novel = await create_novel(db, data)
+    try:
+        novel = await create_novel(db, data)
+    except NovelConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     return NovelOut.model_validate(novel)
 
 
@@ -42,35 +67,122 @@ async def create_novel_endpoint(data: NovelCreate, db: AsyncSession = Depends(db
     response_model=List[NovelBrief],
     status_code=status.HTTP_200_OK,
     summary="List novels",
-    description="List novels with pagination.",
+    description=(
+        "List novels with pagination. Pass `annotate=me` with a bearer token to add bookmark and last-read state, "
+        "`count` to get the number of matches in `X-Total-Count` (`X-Total-Count-Mode` says how it was obtained), "
+        "and `fields` to return only some fields."
+    ),
 )
 async def list_novels_endpoint(
+    request: Request,
     query:  Annotated[NovelQuery, Query()],
-    
-    db: AsyncSession = Depends(db_dep),
-) -> List[NovelBrief]:
+    current_user: OptionalCurrentUser,
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
+    if query.annotate == "me" and current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     s, l = paginate_params(query.skip, query.limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
     query.skip = s
     query.limit = l
-    novels = await list_novels(
-        db,
-        query
-    )
-    return [NovelBrief.model_validate(n) for n in novels]
+    query = canonical_query(query)
+    # Keyword search is the first to shed under load; plain browsing waits with the other reads
+    route_class = SEARCH if query.keyword else BROWSE
+    if query.annotate == "me":
+        async with admission.slot(route_class):
+            return await _annotated_novel_list(db, query, current_user)
+
+    key = novel_list_key(query)
+    entry = novel_list_cache.get(key)
+    # A cached page without a count needs no database work, so it skips admission
+    needs_db = entry is None or query.count is not None
+    async with admission.slot(route_class) if needs_db else nullcontext():
+        if entry is None:
+            entry = await novel_list_flight.do(key, lambda: _load_novel_list(db, query, key))
+        validator, payload = entry
+        if validator.matches(request):
+            # The count is not part of the validator, a revalidating client gets it with the 304
+            response = validator.not_modified()
+        else:
+            response = validator.apply(await payload.response(request))
+        return await _with_total_count(response, db, query)
+
+
+async def _annotated_novel_list(db: AsyncSession, query: NovelQuery, current_user: Principal) -> Response:
+    # Per-user payload: bookmark/history changes do not show in novel timestamps
+    if query.fields is not None:
+        query.fields = tuple(sorted({*query.fields, "is_bookmarked", "last_read_chapter_id"}))
+    serializer = sparse_serializer(NovelBrief, query.fields, many=True)
+    novels = await list_novels(db, query)
+    briefs = serializer.validate(novels)
+    ids = [b.id for b in briefs]
+    bookmarked = await bookmark_service.get_bookmarked_novel_ids(db, current_user.id, ids)
+    last_read = await history_service.get_last_read_chapter_ids(db, current_user.id, ids)
+    for b in briefs:
+        b.is_bookmarked = b.id in bookmarked
+        b.last_read_chapter_id = last_read.get(b.id)
+    response = serializer.response(briefs, validated=True)
+    return await _with_total_count(response, db, query)
+
+
+async def _with_total_count(response: Response, db: AsyncSession, query: NovelQuery) -> Response:
+    if query.count is not None:
+        total, mode = await count_novels(db, query, query.count)
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        response.headers[TOTAL_COUNT_MODE_HEADER] = mode
+    return response
+
+
+async def _load_novel_list(db: AsyncSession, query: NovelQuery, key: str) -> Tuple[Validator, CompressedPayload]:
+    generation = novel_list_generation()
+    validator = Validator.build(f"novels?{key}", await get_novel_list_version(db, query))
+
+    async def render() -> bytes:
+        novels = await list_novels(
+            db,
+            query
+        )
+        return sparse_serializer(NovelBrief, query.fields, many=True).serialize(novels)
+
+    entry = (validator, await cached_payload(validator.etag, render))
+    # A write may have landed mid-load, or this read may not see it yet
+    if may_cache_novel_lists(db, generation):
+        novel_list_cache.set(key, entry)
+    return entry
 
 
 @router.get(
     "/{novel_id}",
+    dependencies=[Depends(admit(BROWSE))],
     response_model=NovelDetail,
     status_code=status.HTTP_200_OK,
     summary="Get novel by id",
-    description="Retrieve a novel by its ID with volumes and chapters.",
+    description="Retrieve a novel by its ID with volumes and chapters. Pass `fields` to return only some fields; volumes are only loaded when included.",
 )
-async def get_novel_endpoint(novel_id: UUID, db: AsyncSession = Depends(db_dep)) -> NovelDetail:
-    novel = await get_novel_detail(db, novel_id)
-    if not novel:
+async def get_novel_endpoint(
+    request: Request,
+    novel_id: UUID,
+    fields: Fields = Depends(fields_query(NovelDetail)),
+    db: AsyncSession = Depends(read_db_dep),
+) -> Response:
+    version = await novel_version_flight.do(novel_id, lambda: get_novel_detail_version(db, novel_id))
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Novel not found")
+    validator = Validator.build(f"novel:{novel_id}?fields={fields_key(fields)}", [version])
+    if validator.matches(request):
+        return validator.not_modified()
+
+    async def render() -> Optional[bytes]:
+        novel = await get_novel_detail(db, novel_id, fields)
+        return sparse_serializer(NovelDetail, fields).serialize(novel) if novel else None
+
+    payload = await cached_payload(validator.etag, render)
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Novel not found")
-    return NovelDetail.model_validate(novel)
+    return validator.apply(await payload.response(request))
 
 
 @router.patch(
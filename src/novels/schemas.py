@@ -1,9 +1,10 @@
 from enum import Enum
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from src.fields import parse_fields
 from src.pagination import MAX_PAGE_SIZE
 from src.pagination import SortDir
 
@@ -29,6 +30,20 @@ class NovelQuery(BaseModel):
     type: Optional[str] = Field(default=None, description="Filter by type")
     sort_by: SortBy = SortBy.LAST_UPDATED
     sort_dir: SortDir = SortDir.DESC
+    annotate: Optional[Literal["me"]] = Field(default=None, description="Add the current user's bookmark and last-read state")
+    count: Optional[Literal["auto", "exact", "estimate"]] = Field(
+        default=None,
+        description="Add X-Total-Count: exact COUNT(*), the planner's estimate, or auto (exact when selective, otherwise estimated then cached)",
+    )
+    fields: Optional[Tuple[str, ...]] = Field(
+        default=None,
+        description="Comma separated NovelBrief fields to return, e.g. id,title,image_url (id is always returned)",
+    )
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value):
+        return parse_fields(value, NovelBrief)
 
 
 
@@ -110,6 +125,9 @@ class NovelBrief(BaseModel):
     last_updated: Optional[datetime] = None
     status: Optional[str] = None
     meta: Optional[Dict[str, Any]] = None
+    # Only filled with annotate=me
+    is_bookmarked: Optional[bool] = None
+    last_read_chapter_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
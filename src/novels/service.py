@@ -1,35 +1,130 @@
-from typing import List, Optional, Sequence
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy import or_, func, asc, desc, select
+from sqlalchemy import Row, or_, func, asc, desc, select, update
+from sqlalchemy.dialects.postgresql import insert
 
+from src.cache import TTLCache
+from src.compression.utils import CompressedPayload
+from src.conditional import Validator
+from src.database import background_read_session, shareable_read
 from src.models import Novel, Volume, Chapter
-from src.utils import measure_time
-from .schemas import NovelBrief, NovelCreate, NovelUpdate, NovelQuery
+from src.notifications import notification_listener
+from src.tracing import traced
+from src.fields import Fields, includes, sparse_model
+from src.utils import estimate_rows, select_from_schema
+from .constants import (
+    NOVEL_COUNT_CACHE_MAX_SIZE,
+    NOVEL_COUNT_CACHE_TTL_SECONDS,
+    NOVEL_LIST_CACHE_MAX_SIZE,
+    NOVEL_LIST_CACHE_TTL_SECONDS,
+    NOVEL_LIST_INVALIDATION_CHANNEL,
+    TOTAL_COUNT_EXACT_THRESHOLD,
+)
+from .exceptions import NovelConflictError
+from .schemas import NovelBrief, NovelCreate, NovelDetail, NovelUpdate, NovelQuery
+
+logger = logging.getLogger(__name__)
+
+# Rendered browse/search pages with their validator; cleared on any novel write, as are counts
+novel_list_cache: TTLCache[str, Tuple[Validator, CompressedPayload]] = TTLCache(
+    NOVEL_LIST_CACHE_MAX_SIZE, NOVEL_LIST_CACHE_TTL_SECONDS, name="novel_list"
+)
+# (total, "cached") per filter set, filled by exact counts and background refreshes
+novel_count_cache: TTLCache[str, Tuple[int, str]] = TTLCache(
+    NOVEL_COUNT_CACHE_MAX_SIZE, NOVEL_COUNT_CACHE_TTL_SECONDS, name="novel_count"
+)
+_count_refreshes: Dict[str, asyncio.Task] = {}
+# Bumped on every clear; a load that started under an older generation may hold pre-write rows
+_novel_list_generation = 0
+_novel_lists_cleared_at = float("-inf")
+
+
+def canonical_query(query: NovelQuery) -> NovelQuery:
+    """Equivalent query with a single spelling: sorted, de-duplicated lists and a lowercased keyword"""
+    keyword = query.keyword.strip().lower() if query.keyword else None
+    return query.model_copy(update={
+        "keyword": keyword or None,
+        "statuses": sorted(set(query.statuses)) if query.statuses else None,
+        "tags": sorted(set(query.tags)) if query.tags else None,
+    })
+
+
+def novel_list_key(query: NovelQuery) -> str:
+    """Cache key of a canonical query"""
+    return query.model_dump_json(exclude={"annotate", "count"})
+
+
+def _clear_novel_lists() -> None:
+    global _novel_list_generation, _novel_lists_cleared_at
+    novel_list_cache.clear()
+    novel_count_cache.clear()
+    _novel_list_generation += 1
+    _novel_lists_cleared_at = time.monotonic()
+
+
+def novel_list_generation() -> int:
+    """Read before loading a list page or count, pass to `may_cache_novel_lists` after"""
+    return _novel_list_generation
+
+
+def may_cache_novel_lists(db: AsyncSession, generation: int) -> bool:
+    """Whether what `db` loaded since `generation` is still current enough to cache"""
+    return generation == _novel_list_generation and shareable_read(db, _novel_lists_cleared_at)
+
+
+async def invalidate_novel_lists(db: AsyncSession) -> None:
+    """Drop cached list pages and counts here and, once the transaction commits, in every other worker"""
+    _clear_novel_lists()
+    await db.execute(select(func.pg_notify(NOVEL_LIST_INVALIDATION_CHANNEL, "")))
+
+
+def _on_novel_lists_invalidated(payload: Optional[str]) -> None:
+    _clear_novel_lists()
+
+
+notification_listener.subscribe(NOVEL_LIST_INVALIDATION_CHANNEL, _on_novel_lists_invalidated)
 
 
 async def create_novel(db: AsyncSession, data: NovelCreate) -> Novel:
-    novel = Novel(
-        title=data.title,
-        other_titles=data.other_titles,
-        authors=data.authors,
-        tags=data.tags,
-        type=data.type,
-        artists=data.artists,
-        status=data.status,
-        description=data.description,
-        meta=data.meta,
-        image_url=data.image_url,
+    stmt = (
+        insert(Novel)
+        .values(
+            title=data.title,
+            other_titles=data.other_titles,
+            authors=data.authors,
+            tags=data.tags,
+            type=data.type,
+            artists=data.artists,
+            status=data.status,
+            description=data.description,
+            meta=data.meta,
+            image_url=data.image_url,
+        )
+        .on_conflict_do_nothing(index_elements=[Novel.title])
+        .returning(Novel)
     )
-    db.add(novel)
+    result = await db.execute(stmt)
+    novel = result.scalar_one_or_none()
+    if novel is None:
+        raise NovelConflictError("Novel title already exists")
+    await invalidate_novel_lists(db)
     await db.commit()
-    await db.refresh(novel)
+    _clear_novel_lists()  # A concurrent request may have re-cached a page before commit
     return novel
 
 
-async def get_novel_detail(db: AsyncSession, novel_id: UUID) -> Optional[Novel]:
+@traced()
+async def get_novel_detail(db: AsyncSession, novel_id: UUID, fields: Fields = None) -> Optional[Novel]:
+    if not includes(fields, "volumes"):
+        stmt = select_from_schema(Novel, sparse_model(NovelDetail, fields)).filter(Novel.id == novel_id)
+        result = await db.execute(stmt)
+        return result.mappings().one_or_none()
     stmt = (
         select(Novel)
         .options(
@@ -54,26 +149,13 @@ async def get_novel_by_title(db: AsyncSession, title: str) -> Optional[Novel]:
 
 
 
-@measure_time
-async def list_novels(
-    db: AsyncSession,
-    query: NovelQuery
-) -> List[Novel]:
-    exclude_cols = {"description"}
-    cols = [col for col in Novel.__table__.columns if col.name not in exclude_cols]
-
-
-    stmt = select(*cols)
-    skip = query.skip
-    limit = query.limit
+def _filter(stmt, query: NovelQuery):
     keyword = query.keyword
     statuses = query.statuses
     author = query.author
     tags = query.tags
     artist = query.artist
     type = query.type
-    sort_by = query.sort_by
-    sort_dir = query.sort_dir
     if query.keyword:
         pattern = f"%{keyword}%"
         stmt = stmt.filter(
@@ -97,6 +179,16 @@ async def list_novels(
     if type:
         stmt = stmt.filter(Novel.type == type)
 
+    return stmt
+
+
+def _list_statement(query: NovelQuery, stmt):
+    stmt = _filter(stmt, query)
+    skip = query.skip
+    limit = query.limit
+    sort_by = query.sort_by
+    sort_dir = query.sort_dir
+
     sort_map = {
         "status": Novel.status,
         "title": Novel.title,
@@ -108,22 +200,113 @@ async def list_novels(
     sort_col = sort_map.get(sort_by, Novel.last_updated)
     order_expr = asc(sort_col) if sort_dir.lower() == "asc" else desc(sort_col)
 
-    stmt = stmt.order_by(order_expr).offset(skip).limit(limit)
-    result = await db.execute(stmt)
+    return stmt.order_by(order_expr).offset(skip).limit(limit)
+
+
+@traced()
+async def list_novels(
+    db: AsyncSession,
+    query: NovelQuery
+) -> List[Novel]:
+    schema = sparse_model(NovelBrief, query.fields)
+    result = await db.execute(_list_statement(query, select_from_schema(Novel, schema)))
     return list(result.mappings().all())
 
 
+async def get_novel_list_version(db: AsyncSession, query: NovelQuery) -> List[Row]:
+    """(id, last_updated) of the page `list_novels` would return, for conditional GET"""
+    result = await db.execute(_list_statement(query, select(Novel.id, Novel.last_updated)))
+    return list(result.all())
+
+
+def novel_count_key(query: NovelQuery) -> str:
+    """Count cache key: the filters of a canonical query, without paging or sorting"""
+    return query.model_dump_json(include={"keyword", "statuses", "author", "tags", "artist", "type"})
+
+
+async def _exact_count(db: AsyncSession, query: NovelQuery) -> int:
+    result = await db.execute(_filter(select(func.count()).select_from(Novel), query))
+    return result.scalar_one()
+
+
+async def _refresh_count(key: str, query: NovelQuery, generation: int) -> None:
+    try:
+        async with background_read_session() as db:
+            total = await _exact_count(db, query)
+            if may_cache_novel_lists(db, generation):
+                novel_count_cache.set(key, (total, "cached"))
+    except Exception:
+        logger.exception("Background novel count failed")
+    finally:
+        _count_refreshes.pop(key, None)
+
+
+async def cancel_count_refreshes() -> None:
+    """Stop background counts before the engine they use is disposed"""
+    tasks = list(_count_refreshes.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def count_novels(db: AsyncSession, query: NovelQuery, mode: str = "auto") -> Tuple[int, str]:
+    """Total matching `query`'s filters, and how it was obtained: exact, estimate or cached.
+
+    auto: a fresh background count if there is one; otherwise the planner's
+    estimate, counted exactly when that is small enough to be cheap, or else
+    returned as is while an exact count is refreshed in the background.
+    """
+    if mode == "exact":
+        return await _exact_count(db, query), "exact"
+    if mode == "estimate":
+        return await estimate_rows(db, _filter(select(Novel.id), query)), "estimate"
+
+    key = novel_count_key(query)
+    generation = novel_list_generation()
+    cached = novel_count_cache.get(key)
+    if cached is not None:
+        return cached
+    estimate = await estimate_rows(db, _filter(select(Novel.id), query))
+    if estimate <= TOTAL_COUNT_EXACT_THRESHOLD:
+        total = await _exact_count(db, query)
+        if may_cache_novel_lists(db, generation):
+            novel_count_cache.set(key, (total, "cached"))
+        return total, "exact"
+    if key not in _count_refreshes:
+        _count_refreshes[key] = asyncio.create_task(_refresh_count(key, query, generation))
+    return estimate, "estimate"
+
+
+async def get_novel_detail_version(db: AsyncSession, novel_id: UUID) -> Optional[Row]:
+    """Newest last_updated across the novel and its TOC, plus counts to catch deletions"""
+    stmt = (
+        select(
+            func.greatest(Novel.last_updated, func.max(Volume.last_updated), func.max(Chapter.last_updated)),
+            func.count(func.distinct(Volume.id)),
+            func.count(Chapter.id),
+        )
+        .select_from(Novel)
+        .outerjoin(Volume, Volume.novel_id == Novel.id)
+        .outerjoin(Chapter, Chapter.volume_id == Volume.id)
+        .filter(Novel.id == novel_id)
+        .group_by(Novel.id)
+    )
+    result = await db.execute(stmt)
+    return result.one_or_none()
+
+
 async def update_novel(db: AsyncSession, novel_id: UUID, data: NovelUpdate) -> Optional[Novel]:
-    stmt = select(Novel).filter(Novel.id == novel_id)
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        return await get_novel(db, novel_id)
+    stmt = update(Novel).filter(Novel.id == novel_id).values(**values).returning(Novel)
     result = await db.execute(stmt)
     novel = result.scalar_one_or_none()
     if not novel:
         return None
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(novel, field, value)
-    db.add(novel)
+    await invalidate_novel_lists(db)
     await db.commit()
-    await db.refresh(novel)
+    _clear_novel_lists()
     return novel
 
 
@@ -134,7 +317,7 @@ async def delete_novel(db: AsyncSession, novel_id: UUID) -> bool:
     if not novel:
         return False
     await db.delete(novel)
+    await invalidate_novel_lists(db)
     await db.commit()
+    _clear_novel_lists()
     return True
-
-
@@ -0,0 +1,10 @@
+import os
+
+# Profiling is disabled unless a token is configured; send it as X-Profile-Token
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005"))
+PROFILE_MIN_INTERVAL_SECONDS = float(os.getenv("PROFILE_MIN_INTERVAL_SECONDS", "10"))  # Per worker
@@ -0,0 +1,10 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from src.profiling.utils import is_admin_token
+
+
+async def require_profiling_admin(x_profile_token: Optional[str] = Header(default=None)) -> None:
+    if not is_admin_token(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling is not allowed")
@@ -0,0 +1,33 @@
+import os
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.profiling.dependencies import require_profiling_admin
+from src.profiling.utils import profile_path
+
+
+router = APIRouter(prefix="/profiles", tags=["profiling"], dependencies=[Depends(require_profiling_admin)])
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@router.get(
+    "/{profile_id}",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get request profile",
+    description="Folded stacks of a profiled request (id from the X-Profile-Id header), for flamegraph.pl or speedscope.",
+)
+async def get_profile_endpoint(profile_id: str) -> PlainTextResponse:
+    path = profile_path(profile_id)
+    if not _PROFILE_ID.match(profile_id) or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(await run_in_threadpool(_read, path))
@@ -0,0 +1,122 @@
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from src.profiling.constants import (
+    PROFILE_DIR,
+    PROFILE_ID_HEADER,
+    PROFILE_MIN_INTERVAL_SECONDS,
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+    PROFILE_TOKEN_HEADER,
+    PROFILING_ADMIN_TOKEN,
+)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    if not PROFILING_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILING_ADMIN_TOKEN.encode())
+
+
+def profile_path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a helper thread into folded-stack counts.
+
+    The event loop thread also runs other requests meanwhile, so their frames show up
+    too; profile on a quiet worker or read the stacks under the endpoint's frames.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Brendan Gregg's collapsed format, readable by flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.items())
+
+
+def _write_profile(profile_id: str, content: str) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class ProfilingMiddleware:
+    """Profiles a request carrying a valid X-Profile-Token, at most once per interval per worker"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._last_started = float("-inf")
+        self._running = False
+
+    def _token(self, scope) -> Optional[str]:
+        for key, value in scope.get("headers", []):
+            if key == PROFILE_TOKEN_HEADER.encode():
+                return value.decode("latin-1")
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_ADMIN_TOKEN or not is_admin_token(self._token(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic()
+        if self._running or now - self._last_started < PROFILE_MIN_INTERVAL_SECONDS:
+            async def send_skipped(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-skipped", b"rate-limited")]
+                await send(message)
+
+            await self.app(scope, receive, send_skipped)
+            return
+
+        self._running = True
+        self._last_started = now
+        profile_id = uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode(), profile_id.encode())
+                ]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self._running = False
+            await run_in_threadpool(_write_profile, profile_id, sampler.folded())
@@ -0,0 +1,35 @@
+from typing import Any, Generic, Type, TypeVar
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class PreserializedJSONResponse(Response):
+    """JSON body that is already bytes; returning a Response makes FastAPI skip response_model work"""
+    media_type = "application/json"
+
+
+class Serializer(Generic[T]):
+    """Precompiled validator + JSON serializer for a response type.
+
+    Validates ORM objects / row mappings once (`from_attributes`) and dumps
+    straight to JSON bytes in pydantic-core, with no intermediate dicts.
+    """
+
+    def __init__(self, type_: Type[T]) -> None:
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def validate(self, obj: Any) -> T:
+        return self.adapter.validate_python(obj, from_attributes=True)
+
+    def dump(self, value: T) -> bytes:
+        return self.adapter.dump_json(value)
+
+    def serialize(self, obj: Any) -> bytes:
+        return self.dump(self.validate(obj))
+
+    def response(self, obj: Any, status_code: int = status.HTTP_200_OK, validated: bool = False) -> PreserializedJSONResponse:
+        value = obj if validated else self.validate(obj)
+        return PreserializedJSONResponse(content=self.dump(value), status_code=status_code)
@@ -0,0 +1,95 @@
+"""Production entry point: a gunicorn master supervising uvicorn workers (uvloop + httptools).
+
+    python -m src.server
+
+Configured by ServerSettings (WEB_* environment variables). Signals to the master:
+
+    HUP          rolling restart: new workers are forked, old ones drain and exit
+    TTIN / TTOU  add / remove one worker
+    USR2, WINCH  deploy new code: start a new master next to the old one, then retire the old workers
+    TERM         graceful stop, each worker gets graceful_timeout to finish
+"""
+import gc
+import glob
+import os
+import tempfile
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker as _UvicornWorker
+
+load_dotenv()
+
+from src.configs import ServerSettings
+
+
+class UvicornWorker(_UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def _prepare_metrics_dir(workers: int) -> None:
+    """prometheus-client picks multiprocess mode at import, so this runs before the app is loaded"""
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        if workers == 1:
+            return
+        path = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+    os.makedirs(path, exist_ok=True)
+    # Files from a previous run would be summed into this one's counters
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+
+
+def _pre_fork(server, worker) -> None:
+    # Move everything imported so far out of the GC's generations; collections in the
+    # workers then stop touching (and un-sharing) the preloaded pages
+    gc.freeze()
+
+
+def _child_exit(server, worker) -> None:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+class Server(BaseApplication):
+    def __init__(self, settings: ServerSettings) -> None:
+        self.settings = settings
+        super().__init__()
+
+    def load_config(self) -> None:
+        s = self.settings
+        options = {
+            "bind": f"{s.host}:{s.port}",
+            "workers": s.workers,
+            "worker_class": UvicornWorker,
+            "preload_app": s.preload,
+            "max_requests": s.max_requests,
+            "max_requests_jitter": s.max_requests_jitter,
+            "graceful_timeout": s.graceful_timeout,
+            "timeout": s.timeout,
+            "keepalive": s.keepalive,
+            "backlog": s.backlog,
+            "pre_fork": _pre_fork,
+            "child_exit": _child_exit,
+        }
+        if s.forwarded_allow_ips:
+            options["forwarded_allow_ips"] = s.forwarded_allow_ips
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.main import app
+
+        return app
+
+
+def main() -> None:
+    settings = ServerSettings.from_env()
+    _prepare_metrics_dir(settings.workers)
+    Server(settings).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from src.counters import SINGLEFLIGHT_FOLLOWERS, SINGLEFLIGHT_LEADERS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Named groups, for coalescing metrics
+flights: Dict[str, "SingleFlight"] = {}
+
+
+class _LeaderCancelled(Exception):
+    """The request computing a shared result went away before finishing it"""
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls with the same key into one in-flight computation.
+
+    The first caller (leader) runs `fn`; callers arriving before it finishes
+    await the same result or exception. Nothing is kept once it completes,
+    caching is the caller's business. If the leader is cancelled (client
+    disconnected), waiting callers retry and one of them takes over.
+    Not thread safe; one event loop per worker.
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.leaders = 0
+        self.followers = 0
+        self._inflight: Dict[K, "asyncio.Future[V]"] = {}
+        self._leader_counter = SINGLEFLIGHT_LEADERS.labels(name) if name else None
+        self._follower_counter = SINGLEFLIGHT_FOLLOWERS.labels(name) if name else None
+        if name:
+            flights[name] = self
+
+    @property
+    def coalescing_ratio(self) -> float:
+        total = self.leaders + self.followers
+        return self.followers / total if total else 0.0
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.followers += 1
+            if self._follower_counter is not None:
+                self._follower_counter.inc()
+            try:
+                # shield: a follower's own cancellation must not cancel the shared future
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        if self._leader_counter is not None:
+            self._leader_counter.inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            # Nobody may be waiting; mark the exception retrieved so asyncio does not log it
+            if future.done() and not future.cancelled():
+                future.exception()
@@ -0,0 +1,277 @@
+import asyncio
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.configs import TracingSettings
+
+settings = TracingSettings.from_env()
+
+# OTLP SpanKind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Upper bounds in milliseconds
+HISTOGRAM_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+@dataclass
+class _Trace:
+    sampled: bool
+    spans: List[Span] = field(default_factory=list)
+
+
+@dataclass
+class Histogram:
+    counts: List[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BUCKETS_MS) + 1))
+    count: int = 0
+    sum_ms: float = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_trace: ContextVar[Optional[_Trace]] = ContextVar("current_trace", default=None)
+_histograms: Dict[str, Histogram] = {}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def span_histograms() -> Dict[str, Histogram]:
+    """Duration histograms per span name, sampled or not"""
+    return dict(_histograms)
+
+
+# -------------------- EXPORT --------------------
+class _JsonLinesExporter:
+    """Appends one OTLP/JSON `resourceSpans` document per trace, from a background thread"""
+
+    def __init__(self, path: str, service_name: str) -> None:
+        self.path = path
+        self.resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self._queue: "queue.SimpleQueue[Optional[List[Span]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, spans: List[Span]) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        self._queue.put(spans)
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    return
+                doc = {
+                    "resourceSpans": [{
+                        "resource": self.resource,
+                        "scopeSpans": [{"scope": {"name": __name__}, "spans": [s.to_otlp() for s in spans]}],
+                    }]
+                }
+                f.write(json.dumps(doc, separators=(",", ":")) + "\n")
+                f.flush()
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_exporter = _JsonLinesExporter(settings.export_path, settings.service_name) if settings.export_path else None
+
+
+def shutdown_tracing() -> None:
+    if _exporter is not None:
+        _exporter.shutdown()
+
+
+# -------------------- SPANS --------------------
+def _begin(name: str, kind: int, attributes: Dict[str, Any]) -> Span:
+    parent = _current_span.get()
+    trace = _current_trace.get()
+    if parent is None or trace is None:
+        trace_id = os.urandom(16).hex()
+        parent_id = None
+    else:
+        trace_id = parent.trace_id
+        parent_id = parent.span_id
+    return Span(name, trace_id, os.urandom(8).hex(), parent_id, kind=kind, attributes=dict(attributes))
+
+
+def _finish(span: Span, trace: Optional[_Trace]) -> None:
+    span.end_ns = time.time_ns()
+    hist = _histograms.get(span.name)
+    if hist is None:
+        hist = _histograms[span.name] = Histogram()
+    hist.observe(span.duration_ms)
+    if trace is not None and trace.sampled:
+        trace.spans.append(span)
+
+
+@contextmanager
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Span]:
+    """Open a span as child of the current one; a span without parent starts a (sampled?) trace"""
+    span = _begin(name, kind, attributes)
+    trace = _current_trace.get()
+    root = span.parent_span_id is None
+    if root:
+        trace = _Trace(sampled=_exporter is not None and random.random() < settings.sample_rate)
+    span_token = _current_span.set(span)
+    trace_token = _current_trace.set(trace) if root else None
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(span_token)
+        if trace_token is not None:
+            _current_trace.reset(trace_token)
+        _finish(span, trace)
+        if root and trace.sampled and trace.spans:
+            _exporter.export(trace.spans)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a sync or async function in a span named after it"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+# -------------------- DB SPANS --------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return
+    span = _begin("db.query", SPAN_KIND_CLIENT, {"db.system": "postgresql", "db.statement": statement[:500]})
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        _finish(spans.pop(), _current_trace.get())
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; end its span here, with the error
+    if context.connection is None or context.execution_context is None:
+        return
+    spans = context.connection.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        span.error = type(context.original_exception).__name__
+        _finish(span, _current_trace.get())
+
+
+def install_db_tracing() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    """Root SERVER span per HTTP request, renamed to the matched route template when done"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        # Unmatched paths share one name so scanners cannot blow up histogram cardinality
+        with start_span(f"{scope['method']} unmatched", SPAN_KIND_SERVER, **attributes) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.attributes["http.route"] = route.path
+                span.attributes["http.status_code"] = status_code
@@ -1,3 +1,5 @@
+import os
+
 # JWT
 SECRET_KEY = "your-secret-key-change-this-in-production-use-env-variable"
 REFRESH_SECRET_KEY = "your-refresh-secret-key-change-this-in-production-use-env-variable"
@@ -5,6 +7,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 15  # 15 minutes
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # 7 days
 
+ACCESS_TOKEN_CACHE_MAX_SIZE = 50_000  # Verified access tokens kept until their exp
+
 ACCESS_TOKEN_COOKIE_NAME = "access_token"
 ACCESS_TOKEN_COOKIE_MAX_AGE = 60 * 15  # 15 minutes in seconds
 ACCESS_TOKEN_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -20,3 +24,15 @@ REFRESH_TOKEN_COOKIE_HTTPONLY = True
 REFRESH_TOKEN_COOKIE_SAMESITE = "lax"  # "strict" or "lax" or "none"
 REFRESH_TOKEN_COOKIE_PATH = "/"
 
+
+
+# Authenticated principal cache
+PRINCIPAL_CACHE_TTL_SECONDS = 60
+PRINCIPAL_CACHE_MAX_SIZE = 10_000
+PRINCIPAL_INVALIDATION_CHANNEL = "principal_invalidate"  # Postgres NOTIFY channel shared by all workers
+
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Hashes with another cost are rehashed on login
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # Reject with 503 above this
@@ -1,16 +1,17 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_db
-from src.models import User
+from src.database import get_async_db, get_async_read_db
+from src.users.schemas import Principal
 from src.users.utils import decode_access_token
-from src.users.service import get_user_by_id
+from src.users.service import get_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login", auto_error=False)
 
 
 async def db_dep(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
@@ -18,10 +19,15 @@ async def db_dep(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
     return db
 
 
+async def read_db_dep(db: AsyncSession = Depends(get_async_read_db)) -> AsyncSession:
+    """Read-only database session dependency"""
+    return db
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(db_dep)
-) -> User:
+) -> Principal:
     """Get current authenticated user from JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,12 +39,27 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = await get_user_by_id(db, user_id)
+    user = await get_principal(db, user_id)
     if user is None:
         raise credentials_exception
     
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+
+
+async def get_optional_current_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(db_dep)
+) -> Optional[Principal]:
+    """Get current user if a valid JWT token is sent, None otherwise"""
+    if token is None:
+        return None
+    user_id = decode_access_token(token)
+    if user_id is None:
+        return None
+    return await get_principal(db, user_id)
+
 
+OptionalCurrentUser = Annotated[Optional[Principal], Depends(get_optional_current_user)]
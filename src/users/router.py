@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.users.schemas import Token, UserOut, UserRegister, UserUpdate, RefreshTokenRequest
-from src.users.dependencies import db_dep, get_current_user, CurrentUser
+from src.users.dependencies import db_dep, read_db_dep, get_current_user, CurrentUser
 from src.users.constants import (
     ACCESS_TOKEN_COOKIE_HTTPONLY,
     ACCESS_TOKEN_COOKIE_MAX_AGE,
@@ -26,6 +26,7 @@ from src.users.service import (
     authenticate_user,
     create_user,
     update_user,
+    get_principal,
     get_user_by_id,
 )
 from src.users.utils import create_access_token, create_refresh_token, decode_refresh_token
@@ -120,8 +121,14 @@ async def login(
     summary="Get current user",
     description="Get the current authenticated user's information.",
 )
-async def get_current_user_info(current_user: CurrentUser) -> UserOut:
-    return UserOut.model_validate(current_user)
+async def get_current_user_info(current_user: CurrentUser, db: AsyncSession = Depends(read_db_dep)) -> UserOut:
+    user = await get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return UserOut.model_validate(user)
 
 
 @router.patch(
@@ -182,7 +189,7 @@ async def refresh_access_token(
         )
     
     # Verify user exists
-    user = await get_user_by_id(db, user_id)
+    user = await get_principal(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,6 +27,17 @@ class UserOut(UserBase):
         from_attributes = True
 
 
+class Principal(BaseModel):
+    """Minimal identity of an authenticated user, safe to cache between requests"""
+    id: UUID
+    username: str
+    avatar_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class UserUpdate(BaseModel):
     username: Optional[str] = Field(None, min_length=3, max_length=50)
     email: Optional[EmailStr] = None
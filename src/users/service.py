@@ -2,33 +2,44 @@ from typing import Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import func, select, or_, update
+from sqlalchemy.dialects.postgresql import insert
 
+from src.cache import TTLCache
 from src.models import User
-from src.users.schemas import UserRegister, UserUpdate
-from src.users.utils import hash_password, verify_password
+from src.notifications import notification_listener
+from src.users.constants import (
+    PRINCIPAL_CACHE_MAX_SIZE,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_INVALIDATION_CHANNEL,
+)
+from src.users.schemas import Principal, UserRegister, UserUpdate
+from src.users.utils import hash_password_async, verify_password_async
 from src.users.exceptions import UserAlreadyExistsError, InvalidCredentialsError
 
+principal_cache: TTLCache[UUID, Principal] = TTLCache(
+    PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS, name="principal"
+)
+
 
 async def create_user(db: AsyncSession, data: UserRegister) -> User:
     """Create a new user"""
-    # Check if username or email already exists
-    stmt = select(User).filter(
-        or_(User.username == data.username, User.email == data.email)
+    # Username and email are both unique, a conflict on either inserts nothing
+    stmt = (
+        insert(User)
+        .values(
+            username=data.username,
+            email=data.email,
+            password=await hash_password_async(data.password),
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
     )
     result = await db.execute(stmt)
-    existing = result.scalar_one_or_none()
-    if existing:
+    user = result.scalar_one_or_none()
+    if user is None:
         raise UserAlreadyExistsError("Username or email already exists")
-    print(data.password)
-    user = User(
-        username=data.username,
-        email=data.email,
-        password=hash_password(data.password),
-    )
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
     return user
 
 
@@ -39,6 +50,37 @@ async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
     return result.scalar_one_or_none()
 
 
+async def get_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+    """Get the cached principal of a user, loading only its identity columns on a miss"""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    stmt = select(User.id, User.username, User.avatar_url).filter(User.id == user_id)
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    if row is None:
+        return None
+    principal = Principal.model_validate(row)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def invalidate_principal(db: AsyncSession, user_id: UUID) -> None:
+    """Drop a cached principal here and, once the transaction commits, in every other worker"""
+    principal_cache.pop(user_id)
+    await db.execute(select(func.pg_notify(PRINCIPAL_INVALIDATION_CHANNEL, str(user_id))))
+
+
+def _on_principal_invalidated(payload: Optional[str]) -> None:
+    try:
+        principal_cache.pop(UUID(payload))
+    except (TypeError, ValueError):
+        principal_cache.clear()
+
+
+notification_listener.subscribe(PRINCIPAL_INVALIDATION_CHANNEL, _on_principal_invalidated)
+
+
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Get user by username"""
     stmt = select(User).filter(User.username == username)
@@ -58,48 +100,52 @@ async def authenticate_user(db: AsyncSession, username: str, password: str) -> U
     user = await get_user_by_username(db, username)
     if not user:
         raise InvalidCredentialsError("Invalid username or password")
-    if not verify_password(password, user.password):
+    valid, new_hash = await verify_password_async(password, user.password)
+    if not valid:
         raise InvalidCredentialsError("Invalid username or password")
+    if new_hash:
+        # Stored hash uses an outdated cost factor, upgrade it transparently
+        user.password = new_hash
+        await db.commit()
     return user
 
 
 async def update_user(db: AsyncSession, user_id: UUID, data: UserUpdate) -> Optional[User]:
     """Update user"""
-    user = await get_user_by_id(db, user_id)
-    if not user:
-        return None
-    
+    taken = []
     if data.username is not None:
-        # Check if new username is taken by another user
-        stmt = select(User).filter(
-            User.username == data.username,
-            User.id != user_id
-        )
-        result = await db.execute(stmt)
-        existing = result.scalar_one_or_none()
-        if existing:
-            raise UserAlreadyExistsError("Username already exists")
-        user.username = data.username
-    
+        taken.append(User.username == data.username)
     if data.email is not None:
-        # Check if new email is taken by another user
-        stmt = select(User).filter(
-            User.email == data.email,
-            User.id != user_id
-        )
+        taken.append(User.email == data.email)
+    if taken:
+        # Check if new username/email is taken by another user
+        stmt = select(User.username, User.email).filter(or_(*taken), User.id != user_id)
         result = await db.execute(stmt)
-        existing = result.scalar_one_or_none()
-        if existing:
+        for row in result.all():
+            if row.username == data.username:
+                raise UserAlreadyExistsError("Username already exists")
             raise UserAlreadyExistsError("Email already exists")
-        user.email = data.email
-    
+
+    values = {}
+    if data.username is not None:
+        values["username"] = data.username
+    if data.email is not None:
+        values["email"] = data.email
     if data.avatar_url is not None:
-        user.avatar_url = data.avatar_url
-    
+        values["avatar_url"] = data.avatar_url
     if data.password is not None:
-        user.password = hash_password(data.password)
-    
+        values["password"] = await hash_password_async(data.password)
+
+    if not values:
+        return await get_user_by_id(db, user_id)
+
+    stmt = update(User).filter(User.id == user_id).values(**values).returning(User)
+    result = await db.execute(stmt)
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+
+    await invalidate_principal(db, user_id)
     await db.commit()
-    await db.refresh(user)
+    principal_cache.pop(user_id)  # A concurrent request may have re-cached the old row before commit
     return user
-
@@ -1,29 +1,52 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from uuid import UUID
 
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 
+from src.cache import TTLCache
+from src.hashing import PasswordHasher, hash_secret, verify_and_update
 from src.users.constants import (
     SECRET_KEY,
     REFRESH_SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    ACCESS_TOKEN_CACHE_MAX_SIZE,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS,
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+# sha256(token) -> user_id of access tokens that already passed verification
+access_token_cache: TTLCache[bytes, UUID] = TTLCache(
+    ACCESS_TOKEN_CACHE_MAX_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60, name="access_token"
+)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    """Hash a password using bcrypt (blocking, for scripts; handlers use hash_password_async)"""
+    return hash_secret(password, BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (blocking, for scripts)"""
+    valid, _ = verify_and_update(plain_password, hashed_password, BCRYPT_ROUNDS)
+    return valid
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing process pool"""
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing process pool, return (valid, rehashed password or None)"""
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -50,8 +73,8 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[UUID]:
-    """Decode JWT access token and return user_id"""
+def verify_access_token(token: str) -> Optional[Tuple[UUID, float]]:
+    """Fully verify a JWT access token and return (user_id, exp timestamp)"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         token_type: str = payload.get("type")
@@ -60,9 +83,25 @@ def decode_access_token(token: str) -> Optional[UUID]:
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
-        return UUID(user_id)
-    except JWTError:
+        return UUID(user_id), float(payload["exp"])
+    except (JWTError, KeyError, ValueError):
+        return None
+
+
+def decode_access_token(token: str) -> Optional[UUID]:
+    """Decode JWT access token and return user_id, reusing earlier verifications until exp"""
+    key = hashlib.sha256(token.encode()).digest()
+    user_id = access_token_cache.get(key)
+    if user_id is not None:
+        return user_id
+    verified = verify_access_token(token)
+    if verified is None:
         return None
+    user_id, exp = verified
+    ttl = exp - time.time()
+    if ttl > 0:
+        access_token_cache.set(key, user_id, ttl=ttl)
+    return user_id
 
 
 def decode_refresh_token(token: str) -> Optional[UUID]:
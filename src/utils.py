@@ -1,21 +1,68 @@
 
+import json
 import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
 
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from src.database import Base
 
 
-def measure_time(func):
-    async def wrapper(*args, **kwargs):
+class StepTimer:
+    """Collects named durations, e.g. for the startup report"""
+
+    def __init__(self) -> None:
+        self.steps: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
         start = time.perf_counter()
-        result = await func(*args, **kwargs)
-        end = time.perf_counter()
-        print(f"{func.__name__} took {end - start:.4f} seconds")
-        return result
-    return wrapper
-from sqlalchemy import select
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.steps}
+
+    def report(self) -> str:
+        total = sum(seconds for _, seconds in self.steps)
+        parts = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.steps)
+        return f"{parts} (total {total * 1000:.1f}ms)"
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <stmt>; plans without running it"""
+    inherit_cache = False
+
+    def __init__(self, stmt) -> None:
+        self.statement = stmt
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db: AsyncSession, stmt) -> int:
+    """The planner's row estimate for `stmt`, from table statistics (as fresh as the last ANALYZE)"""
+    plan = (await db.execute(Explain(stmt))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 
 def select_from_schema(model: Base, schema: BaseModel):
-    columns = [getattr(model, f) for f in schema.model_fields.keys() if hasattr(model, f)]
+    """SELECT of the `model` columns that `schema` outputs; relationships and excluded fields are skipped"""
+    table_columns = model.__table__.columns
+    columns = [
+        getattr(model, f)
+        for f, info in schema.model_fields.items()
+        if f in table_columns and not info.exclude
+    ]
     return select(*columns)
 
@@ -0,0 +1,38 @@
+"""Assertions shared by the test modules"""
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from src.database import get_async_engine
+
+
+@contextmanager
+def count_round_trips(engine=None) -> Iterator[List[str]]:
+    """Record every SQL statement sent through `engine` (default: the API's async engine)"""
+    target = engine or get_async_engine()
+    target = getattr(target, "sync_engine", target)
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def assert_round_trips(expected: int, engine=None) -> Iterator[List[str]]:
+    """Fail if the wrapped block (e.g. one test client call) runs other than `expected` statements
+
+        with assert_round_trips(1):
+            await client.patch(f"/api/bookmarks/{bookmark_id}", json={"line": 10})
+    """
+    with count_round_trips(engine) as statements:
+        yield statements
+    assert len(statements) == expected, (
+        f"expected {expected} round trips, got {len(statements)}:\n" + "\n".join(statements)
+    )
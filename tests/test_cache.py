@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+import pytest
+
+from src.cache import TTLCache
+from src.compression.utils import cached_payload, response_cache
+
+
+def test_evicts_least_recently_used_past_maxbytes():
+    cache = TTLCache(maxsize=10, ttl=60, maxbytes=10, sizeof=len)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.nbytes == 8
+
+
+def test_resize_accounts_for_growth_in_place():
+    cache = TTLCache(maxsize=10, ttl=60, maxbytes=10, sizeof=len)
+    first, second = bytearray(b"1234"), bytearray(b"1234")
+    cache.set("a", first)
+    cache.set("b", second)
+    second.extend(b"12345")
+    cache.resize("b")
+    assert cache.get("a") is None
+    assert cache.nbytes == 9
+
+
+def test_entry_larger_than_maxbytes_is_not_kept():
+    cache = TTLCache(maxsize=10, ttl=60, maxbytes=3, sizeof=len)
+    cache.set("a", b"1234")
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+@pytest.mark.anyio
+async def test_response_cache_counts_compressed_variants():
+    async def render():
+        return b'{"title": "novel"}' * 100
+
+    payload = await cached_payload(uuid4().hex, render)
+    before = response_cache.nbytes
+    variant = await payload.encoded("gzip")
+    assert response_cache.nbytes == before + len(variant)
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src import instrumentation, tracing
+from src.database import get_async_engine
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_failed_statement_is_counted_and_cleared(database):
+    instrumentation.install_sql_instrumentation()
+    stats = instrumentation.RequestSqlStats()
+    token = instrumentation._current.set(stats)
+    try:
+        async with get_async_engine().connect() as conn:
+            with pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT 1 / 0"))
+            assert conn.info.get("query_start") == []
+    finally:
+        instrumentation._current.reset(token)
+    assert stats.queries == 1
+    assert stats.db_seconds > 0
+
+
+async def test_failed_statement_ends_its_span_with_the_error(database, monkeypatch):
+    tracing.install_db_tracing()
+    exported = []
+    monkeypatch.setattr(tracing, "_exporter", SimpleNamespace(export=exported.append))
+    monkeypatch.setattr(tracing.settings, "sample_rate", 1.0)
+    with tracing.start_span("test"):
+        async with get_async_engine().connect() as conn:
+            with pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT 1 / 0"))
+            assert conn.info.get("trace_spans") == []
+    [spans] = exported
+    [span] = [span for span in spans if span.name == "db.query"]
+    assert span.error is not None
+    assert span.end_ns > 0
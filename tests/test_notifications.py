@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from src.database import AsyncSessionLocal
+from src.notifications import NotificationListener
+
+pytestmark = pytest.mark.anyio
+
+CHANNEL = "test_notifications"
+
+
+async def notify(payload: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(func.pg_notify(CHANNEL, payload)))
+        await db.commit()
+
+
+async def wait_for(condition, timeout: float = 5) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.fixture
+async def listener(database):
+    received = []
+    listener = NotificationListener(retry_min=0.01)
+    listener.subscribe(CHANNEL, received.append)
+    listener.received = received
+    listener.start()
+    await wait_for(lambda: listener.connected)
+    yield listener
+    await listener.stop()
+
+
+async def test_delivers_notifications(listener):
+    await notify("one")
+    await wait_for(lambda: listener.received)
+    assert listener.received == ["one"]
+
+
+async def test_reconnects_and_reports_the_gap(listener):
+    pid = listener._conn.get_server_pid()
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(func.pg_terminate_backend(pid)))
+    await wait_for(lambda: listener.connected and listener._conn.get_server_pid() != pid)
+    assert listener.received == [None]
+
+    await notify("after")
+    await wait_for(lambda: len(listener.received) == 2)
+    assert listener.received == [None, "after"]
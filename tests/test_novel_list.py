@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from src.admission.utils import admission
+from src.database import AsyncSessionLocal
+from src.novels import router, service
+from src.novels.schemas import NovelQuery
+from tests.helpers import assert_round_trips
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cached_page_skips_database_and_admission(client, chapter):
+    response = await client.get("/api/novels", params={"limit": 5})
+    assert response.status_code == 200, response.text
+    admitted = admission.stats["browse"].admitted
+    with assert_round_trips(0):
+        cached = await client.get("/api/novels", params={"limit": 5})
+    assert cached.status_code == 200
+    assert cached.content == response.content
+    assert admission.stats["browse"].admitted == admitted
+
+
+async def test_keyword_search_is_admitted_as_search(client, chapter):
+    searches = admission.stats["search"].admitted
+    browses = admission.stats["browse"].admitted
+    response = await client.get("/api/novels", params={"keyword": "novel", "limit": 7})
+    assert response.status_code == 200, response.text
+    assert admission.stats["search"].admitted == searches + 1
+    assert admission.stats["browse"].admitted == browses
+
+
+async def test_page_loaded_across_an_invalidation_is_not_cached(client, chapter, monkeypatch):
+    list_novels = router.list_novels
+
+    async def invalidated_mid_load(db, query):
+        novels = await list_novels(db, query)
+        service._clear_novel_lists()
+        return novels
+
+    monkeypatch.setattr(router, "list_novels", invalidated_mid_load)
+    response = await client.get("/api/novels", params={"limit": 3})
+    assert response.status_code == 200, response.text
+    assert len(service.novel_list_cache) == 0
+
+
+async def test_count_taken_across_an_invalidation_is_not_cached(database, chapter, monkeypatch):
+    exact_count = service._exact_count
+
+    async def invalidated_mid_count(db, query):
+        total = await exact_count(db, query)
+        service._clear_novel_lists()
+        return total
+
+    monkeypatch.setattr(service, "_exact_count", invalidated_mid_count)
+    async with AsyncSessionLocal() as db:
+        total, source = await service.count_novels(db, NovelQuery())
+    assert source == "exact"
+    assert total >= 1
+    assert len(service.novel_count_cache) == 0
+
+
+async def test_not_modified_varies_like_the_page(client, chapter):
+    response = await client.get("/api/novels", params={"limit": 4}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    revalidated = await client.get(
+        "/api/novels",
+        params={"limit": 4},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["vary"] == response.headers["vary"]
+
+
+async def test_not_modified_keeps_the_total_count(client, chapter):
+    params = {"limit": 6, "count": "exact"}
+    response = await client.get("/api/novels", params=params)
+    assert response.status_code == 200, response.text
+    revalidated = await client.get("/api/novels", params=params, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["x-total-count"] == response.headers["x-total-count"]
+    assert revalidated.headers["x-total-count-mode"] == "exact"
+
+
+async def test_cancel_count_refreshes(database, monkeypatch):
+    started = asyncio.Event()
+
+    async def refresh():
+        started.set()
+        await asyncio.sleep(60)
+
+    task = asyncio.create_task(refresh())
+    monkeypatch.setitem(service._count_refreshes, "test", task)
+    await started.wait()
+    await service.cancel_count_refreshes()
+    assert task.cancelled()
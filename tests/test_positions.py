@@ -0,0 +1,43 @@
+from uuid import uuid4
+
+import pytest
+
+from src.bookmarks.utils import PositionStore
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_bookmark(client, auth_headers, chapter):
+    response = await client.post(
+        "/api/bookmarks",
+        headers=auth_headers,
+        json={"novel_id": str(chapter.volume.novel_id), "type": "chapter", "chapter_id": str(chapter.id), "line": 1},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def get_bookmark(client, auth_headers, bookmark_id):
+    response = await client.get(f"/api/bookmarks/{bookmark_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_unknown_chapter_does_not_block_the_batch(client, auth_headers, user, chapter):
+    bookmark = await create_bookmark(client, auth_headers, chapter)
+    store = PositionStore()
+    store.record(user.id, chapter.volume.novel_id, uuid4(), 3)
+    store.record(uuid4(), uuid4(), None, 4)
+    assert await store.flush(force=True) == 2
+    assert len(store) == 0
+    assert (await get_bookmark(client, auth_headers, bookmark["id"]))["line"] == 1
+
+
+async def test_position_without_chapter_keeps_the_stored_one(client, auth_headers, user, chapter):
+    bookmark = await create_bookmark(client, auth_headers, chapter)
+    store = PositionStore()
+    store.record(user.id, chapter.volume.novel_id, None, 7)
+    await store.flush(force=True)
+    stored = await get_bookmark(client, auth_headers, bookmark["id"])
+    assert stored["chapter_id"] == str(chapter.id)
+    assert stored["line"] == 7
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from tests.helpers import assert_round_trips
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_bookmark(client, auth_headers, chapter):
+    response = await client.post(
+        "/api/bookmarks",
+        headers=auth_headers,
+        json={"novel_id": str(chapter.volume.novel_id), "type": "chapter", "chapter_id": str(chapter.id), "line": 1},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def test_create_bookmark(client, auth_headers, chapter):
+    with assert_round_trips(1):
+        await create_bookmark(client, auth_headers, chapter)
+
+
+async def test_create_bookmark_conflict(client, auth_headers, chapter):
+    await create_bookmark(client, auth_headers, chapter)
+    with assert_round_trips(1):
+        response = await client.post(
+            "/api/bookmarks",
+            headers=auth_headers,
+            json={"novel_id": str(chapter.volume.novel_id), "type": "novel"},
+        )
+    assert response.status_code == 409
+
+
+async def test_update_bookmark(client, auth_headers, chapter):
+    bookmark = await create_bookmark(client, auth_headers, chapter)
+    with assert_round_trips(1):
+        response = await client.patch(f"/api/bookmarks/{bookmark['id']}", headers=auth_headers, json={"line": 10})
+    assert response.status_code == 200, response.text
+    assert response.json()["line"] == 10
+
+
+async def test_sync_bookmarks(client, auth_headers, chapter):
+    await create_bookmark(client, auth_headers, chapter)
+    stale = datetime.now(timezone.utc) - timedelta(days=1)
+    with assert_round_trips(1):
+        response = await client.post(
+            "/api/bookmarks/sync",
+            headers=auth_headers,
+            json={"items": [{
+                "novel_id": str(chapter.volume.novel_id),
+                "type": "chapter",
+                "chapter_id": str(chapter.id),
+                "line": 5,
+                "updated_at": stale.isoformat(),
+            }]},
+        )
+    assert response.status_code == 200, response.text
+    # The server's copy is newer, so it comes back and the stale line is not applied
+    assert [b["line"] for b in response.json()] == [1]
+
+
+async def test_sync_bookmarks_rejects_naive_timestamps(client, auth_headers, chapter):
+    with assert_round_trips(0):
+        response = await client.post(
+            "/api/bookmarks/sync",
+            headers=auth_headers,
+            json={"items": [{"novel_id": str(chapter.volume.novel_id), "type": "novel", "updated_at": "2026-01-01T00:00:00"}]},
+        )
+    assert response.status_code == 422
+
+
+async def test_sync_bookmarks_drops_missing_references(client, auth_headers, chapter):
+    now = datetime.now(timezone.utc).isoformat()
+    with assert_round_trips(1):
+        response = await client.post(
+            "/api/bookmarks/sync",
+            headers=auth_headers,
+            json={"items": [
+                {"novel_id": str(uuid4()), "type": "novel", "updated_at": now},
+                {"novel_id": str(chapter.volume.novel_id), "type": "chapter", "chapter_id": str(uuid4()), "updated_at": now},
+            ]},
+        )
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+    listed = await client.get("/api/bookmarks", headers=auth_headers)
+    assert listed.json() == []
+
+    response = await client.post(
+        "/api/bookmarks/sync",
+        headers=auth_headers,
+        json={"items": [{"novel_id": str(chapter.volume.novel_id), "type": "chapter", "chapter_id": str(chapter.id), "updated_at": now}]},
+    )
+    assert response.status_code == 200, response.text
+    listed = await client.get("/api/bookmarks", headers=auth_headers)
+    assert [b["chapter_id"] for b in listed.json()] == [str(chapter.id)]
+
+
+async def test_sync_bookmarks_requires_chapter_for_chapter_bookmarks(client, auth_headers, chapter):
+    with assert_round_trips(0):
+        response = await client.post(
+            "/api/bookmarks/sync",
+            headers=auth_headers,
+            json={"items": [{"novel_id": str(chapter.volume.novel_id), "type": "chapter", "updated_at": "2026-01-01T00:00:00Z"}]},
+        )
+    assert response.status_code == 422
+
+
+async def test_add_history(client, auth_headers, chapter):
+    # The previous entry for the chapter is deleted so the new one sorts first
+    with assert_round_trips(2):
+        response = await client.post(
+            "/api/histories",
+            headers=auth_headers,
+            json={"novel_id": str(chapter.volume.novel_id), "chapter_id": str(chapter.id)},
+        )
+    assert response.status_code == 201, response.text